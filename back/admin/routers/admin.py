@@ -1,28 +1,30 @@
 import json
-from asyncio import create_task
 from datetime import date
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Body, File, HTTPException, status, Depends
+from fastapi import APIRouter, Body, File, HTTPException, Request, status, Depends
 from fastapi.datastructures import UploadFile
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import ValidationError
 
 from admin.schemas.requests import ResetUserPasswordRequest, UserUpdateRequest
-from admin.schemas.responses import EventCommentAdminResponse, UserAdminResponse
+from admin.schemas.responses import CacheStatsResponse, EventCommentAdminResponse, UserAdminResponse
 from events.enums.events import EventCity, EventStatus, EventType
 from events.schemas.requests import EventRequest, EventUpdateRequest
 from events.schemas.responses import EventResponse
+from events.services.cache import events_cache
 from events.services.events import EventsService
 from events.services.images import ImagesService
 from main.config.settings import settings
-from main.db.db import SessionDependency
+from main.db.db import SessionDependency, SessionLocal
+from main.http.ndjson import NDJSON_MEDIA_TYPE, wants_ndjson
 from users.models.user import User
 from admin.dependencies.admin import admin_dependency
 from main.schemas.responses import MessageResponse
 from notifications.enums.notifications import NotificationType
-from notifications.services.email import EmailService
+from notifications.enums.outbox import EmailKind
 from notifications.services.notifications import NotificationsService
+from notifications.services.outbox import OutboxService
 from users.services.users import UsersService
 
 router = APIRouter()
@@ -60,21 +62,6 @@ async def create_event_request(
             detail=f"Invalid invited_users format: {str(e)}. Expected JSON array with at least one user ID, e.g. [1, 2, 3]"
         )
 
-    invalid_user_ids = []
-    valid_users = []
-    for user_id in invited_users_list:
-        try:
-            user = await UsersService.get_user_by_id(session, user_id)
-            valid_users.append(user)
-        except HTTPException:
-            invalid_user_ids.append(user_id)
-    
-    if invalid_user_ids:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Users with IDs {invalid_user_ids} not found"
-        )
-
     try:
         event = EventRequest(
             name=name,
@@ -94,28 +81,13 @@ async def create_event_request(
 
     image_path = await ImagesService.save_image(photo)
 
-    event_obj = await EventsService.create_event(session, event, image_path)
-
-    for user in valid_users:
-                formatted_event_date = event.start_date.strftime("%d.%m.%Y")
-                create_task(EmailService.send_event_created_email(
-                    email=user.email,
-                    event_name=event.name,
-                    event_date=formatted_event_date,
-                    event_time="",
-                    event_location=event.location if event.location else "Не указано",
-                    max_participants=event.max_members if event.max_members else "Не указано",
-                    event_description=event.description if event.description else "Не указано",
-                    event_url=f"{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event_obj.id)}"
-                ))
-
-                await NotificationsService.create_notification(
-                    session=session,
-                    user_id=user.id,
-                    event_id=event_obj.id,
-                    type=NotificationType.EVENT_CREATED
-                )
-    await session.commit()
+    # Событие, приглашения, письма и уведомления фиксируются одной транзакцией в create_event;
+    # там же проверяются приглашённые (404 со списком несуществующих id)
+    try:
+        event_obj = await EventsService.create_event(session, event, image_path)
+    except HTTPException:
+        ImagesService.delete_image(image_path)
+        raise
 
     event_response = EventResponse.model_validate(event_obj)
     return event_response.model_copy(update={'is_user_in_event': False})
@@ -158,41 +130,30 @@ async def update_event_request(
     event = await EventsService.get_event_by_id(session, event_id)
 
     if event_status == EventStatus.CANCELLED and event.status != EventStatus.CANCELLED:
-        members = await EventsService.get_event_members(session, event_id)
-        for member in members:
-            formatted_event_date = event.start_date.strftime("%d.%m.%Y")
-            create_task(EmailService.send_event_cancelled_email(
-                email=member.email,
-                event_name=event.name,
-                event_date=formatted_event_date,
-                event_location=event.location if event.location else "Не указано",
-                event_url=f"{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event_id)}"
-            ))
-            await NotificationsService.create_notification(
-                session=session,
-                user_id=member.id,
-                event_id=event_id,
-                type=NotificationType.EVENT_CANCELLED
-            )
+        await OutboxService.enqueue_for_members(
+            session, event_id, EmailKind.EVENT_CANCELLED,
+            event_name=event.name,
+            event_date=event.start_date.strftime("%d.%m.%Y"),
+            event_location=event.location if event.location else "Не указано",
+            event_url=f"{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event_id)}"
+        )
+        await NotificationsService.create_notifications_for_members(
+            session, [event_id], NotificationType.EVENT_CANCELLED
+        )
     else:
-        members = await EventsService.get_event_members(session, event_id)
-        for member in members:
-            create_task(EmailService.send_event_updated_email(
-                email=member.email,
-                event_name=event.name,
-                old_date=event.start_date.strftime("%d.%m.%Y") if new_event.start_date else None,
-                new_date=new_event.start_date.strftime("%d.%m.%Y") if new_event.start_date else None,
-                old_location=event.location if new_event.location else None,
-                new_location=new_event.location if new_event.location else None,
-                new_description=new_event.description if new_event.description else None,
-                event_url=f"{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event_id)}"
-            ))
-            await NotificationsService.create_notification(
-                session=session,
-                user_id=member.id,
-                event_id=event_id,
-                type=NotificationType.EVENT_UPDATED
-            )
+        await OutboxService.enqueue_for_members(
+            session, event_id, EmailKind.EVENT_UPDATED,
+            event_name=event.name,
+            old_date=event.start_date.strftime("%d.%m.%Y") if new_event.start_date else None,
+            new_date=new_event.start_date.strftime("%d.%m.%Y") if new_event.start_date else None,
+            old_location=event.location if new_event.location else None,
+            new_location=new_event.location if new_event.location else None,
+            new_description=new_event.description if new_event.description else None,
+            event_url=f"{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event_id)}"
+        )
+        await NotificationsService.create_notifications_for_members(
+            session, [event_id], NotificationType.EVENT_UPDATED
+        )
 
     if photo:
         # TODO: Delete old image
@@ -204,6 +165,16 @@ async def update_event_request(
     return event_response.model_copy(update={'is_user_in_event': False})
 
 
+@router.delete('/events/{event_id}', response_model=MessageResponse, status_code=status.HTTP_200_OK)
+async def delete_event_request(
+    session: SessionDependency,
+    event_id: int,
+    admin: User = Depends(admin_dependency),
+) -> MessageResponse:
+    await EventsService.delete_event(session, event_id)
+    return MessageResponse(message="Event deleted successfully")
+
+
 @router.get('/events/{event_id}/members-csv', status_code=status.HTTP_200_OK)
 async def get_event_members_csv_request(
     session: SessionDependency,
@@ -224,11 +195,29 @@ async def get_event_members_excel_request(
     return FileResponse(path=str(excel_path), filename=f"members_event_{event_id}.xlsx")
 
 
+@router.get('/cache/events', response_model=CacheStatsResponse, status_code=status.HTTP_200_OK)
+async def get_events_cache_stats_request(
+    admin: User = Depends(admin_dependency),
+) -> CacheStatsResponse:
+    return CacheStatsResponse(**events_cache.stats())
+
+
+async def stream_users_ndjson() -> AsyncIterator[str]:
+    # Отдельная сессия: генератор работает уже после выхода из обработчика
+    async with SessionLocal() as session:
+        async for users in UsersService.stream_users(session, batch_size=settings.STREAM_BATCH_SIZE):
+            yield "".join(UserAdminResponse.model_validate(user).model_dump_json() + "\n" for user in users)
+
+
 @router.get('/users', response_model=List[UserAdminResponse], status_code=status.HTTP_200_OK)
 async def get_users_request(
     session: SessionDependency,
+    request: Request,
     admin: User = Depends(admin_dependency),
 ) -> List[UserAdminResponse]:
+    if wants_ndjson(request):
+        return StreamingResponse(stream_users_ndjson(), media_type=NDJSON_MEDIA_TYPE)
+
     users = await UsersService.get_users(session)
     users_response = [UserAdminResponse.model_validate(user) for user in users]
     return users_response
@@ -252,9 +241,7 @@ async def reset_user_password_request(
     admin: User = Depends(admin_dependency),
 ) -> MessageResponse:
     user = await UsersService.get_user_by_id(session, user_id)
+    # Письмо фиксируется вместе с новым паролем: reset_password коммитит сессию
+    OutboxService.enqueue(session, user.email, EmailKind.ADMIN_RESET_PASSWORD, new_password=request.new_password)
     await UsersService.reset_password(session, email=user.email, new_password=request.new_password)
-    create_task(EmailService.send_admin_reset_password_email(
-        email=user.email,
-        new_password=request.new_password
-    ))
     return MessageResponse(message="Password reset successfully")
@@ -27,4 +27,13 @@ class EventCommentAdminResponse(BaseModel):
     user_id: int
     user: UserResponse
     comment: str
-    rating: int | None
\ No newline at end of file
+    rating: int | None
+
+class CacheStatsResponse(BaseModel):
+    size: int
+    max_size: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
@@ -0,0 +1,313 @@
+"""Сквозной бенчмарк горячих путей API.
+
+Поднимает приложение из main.main прямо в процессе (без сети и uvicorn: запросы
+подаются в ASGI-приложение) поверх базы из DATABASE_URL и меряет p50/p95/p99 и
+пропускную способность для /auth, ленты событий с типовыми фильтрами, страниц
+/events/page (в том числе с курсором на глубине --page-depth и с поиском), карточки
+события, join/leave, like/unlike, уведомлений и выгрузок CSV/Excel. Результат
+пишется в JSON с хэшем коммита, чтобы прогоны можно было сравнивать.
+
+    python -m benchmarks.api --requests 500 --concurrency 20 --output results.json
+
+База должна быть на последней миграции и с данными: хватит фикстур, для
+реалистичных объёмов - python -m benchmarks.dataset. Письма из join/leave пишутся
+в email_outbox; воркер доставки на время прогона лучше не запускать или направить
+его SMTP в заглушку.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+from urllib.parse import urlencode
+
+from sqlalchemy import func, select
+
+from events.models.events import Event
+from events.services.events import EventsService
+from main.db.db import SessionLocal, engine, init_db
+from main.main import app
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+class BenchmarkClient:
+    """Минимальный ASGI-клиент: один HTTP-запрос - один вызов приложения."""
+
+    def __init__(self, token: Optional[str] = None):
+        self.token = token
+
+    async def request(self, method: str, path: str, params: Optional[dict] = None, json_body=None) -> tuple[int, bytes]:
+        body = json.dumps(json_body).encode() if json_body is not None else b""
+        headers = [(b"host", b"benchmark"), (b"content-length", str(len(body)).encode())]
+        if json_body is not None:
+            headers.append((b"content-type", b"application/json"))
+        if self.token:
+            headers.append((b"authorization", f"Bearer {self.token}".encode()))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": urlencode(params or {}, doseq=True).encode(),
+            "headers": headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("benchmark", 80),
+        }
+        request_sent = False
+        disconnected = asyncio.Event()
+        status_code = 0
+        chunks = []
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Клиент "висит" до конца ответа, как настоящий
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body"):
+                    disconnected.set()
+
+        await app(scope, receive, send)
+        return status_code, b"".join(chunks)
+
+    async def json(self, method: str, path: str, **kwargs):
+        status_code, content = await self.request(method, path, **kwargs)
+        if status_code >= 400:
+            raise RuntimeError(f"{method} {path} -> {status_code}: {content[:200]!r}")
+        return json.loads(content)
+
+
+async def login(email: str, password: str) -> BenchmarkClient:
+    response = await BenchmarkClient().json("POST", "/auth", json_body={"email": email, "password": password})
+    return BenchmarkClient(token=response["access_token"])
+
+
+def summarize(timings: list[float], errors: int, elapsed: float) -> dict:
+    if not timings:
+        return {"requests": 0, "errors": errors}
+    percentiles = statistics.quantiles(timings, n=100, method="inclusive") if len(timings) > 1 else timings * 99
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "throughput_rps": round(len(timings) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(percentiles[49], 3),
+        "p95_ms": round(percentiles[94], 3),
+        "p99_ms": round(percentiles[98], 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+async def run_scenario(
+    name: str,
+    call: Callable[[int, int], Awaitable[int]],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> dict:
+    """Гоняет call(i, worker) requests раз в concurrency параллельных потоках; call возвращает HTTP-статус.
+
+    worker - номер потока (0..concurrency-1): сценарии с состоянием делят по нему данные,
+    чтобы параллельные запросы не мешали друг другу.
+    """
+
+    for i in range(warmup):
+        await call(i, 0)
+
+    timings: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker(number: int):
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            status_code = await call(i, number)
+            timings.append((time.perf_counter() - started) * 1000)
+            if status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    result = summarize(timings, errors, time.perf_counter() - started)
+    result["concurrency"] = concurrency
+    print(f"{name:<24} " + " ".join(f"{key}={value}" for key, value in result.items()))
+    return result
+
+
+async def deep_cursor(depth: float) -> Optional[str]:
+    # Курсор страницы на глубине depth (0..1) ленты админа, как если бы её долистали:
+    # проверяет, что keyset-страница не дорожает с глубиной
+    query = EventsService.build_events_query(is_admin=True)
+    async with SessionLocal() as session:
+        total = await session.scalar(query.with_only_columns(func.count()).order_by(None))
+        if not total:
+            return None
+        row = (await session.execute(
+            query.with_only_columns(Event.start_date, Event.id)
+            .order_by(None)
+            .order_by(Event.start_date, Event.id)
+            .offset(min(int(total * depth), total - 1))
+            .limit(1)
+        )).one()
+    return EventsService.encode_cursor([row.start_date.isoformat(), row.id])
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="запросов на сценарий")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--export-requests", type=int, default=20, help="запросов на выгрузку CSV/Excel")
+    parser.add_argument("--user-email", default="ivan@example.com")
+    parser.add_argument("--user-password", default="user123")
+    parser.add_argument("--admin-email", default="admin@example.com")
+    parser.add_argument("--admin-password", default="admin123")
+    parser.add_argument("--search", default="конференция")
+    parser.add_argument("--city", default="Москва")
+    parser.add_argument("--page-depth", type=float, default=0.9, help="глубина курсора для events_page_deep, 0..1")
+    parser.add_argument("--only", nargs="*", help="запустить только перечисленные сценарии")
+    parser.add_argument("--output", type=Path, help=f"файл результата, по умолчанию {RESULTS_DIR}/api-<коммит>-<время>.json")
+    args = parser.parse_args()
+
+    await init_db()
+    rng = random.Random(0)
+
+    try:
+        user = await login(args.user_email, args.user_password)
+        admin = await login(args.admin_email, args.admin_password)
+
+        # Только события, куда пользователь приглашён, которые ещё не прошли и где есть места:
+        # на них работают join/like (на полном событии join ставит в очередь, и leave отвечает 400)
+        visible = await user.json("GET", "/events", params={"view": "card"})
+        open_ids = [
+            event["id"] for event in visible
+            if event["status"] in ("coming soon", "active")
+            and (event["max_members"] is None or event["members_count"] < event["max_members"])
+        ]
+        event_ids = [event["id"] for event in visible]
+        if not open_ids:
+            raise SystemExit(f"{args.user_email} не приглашён ни в одно открытое событие со свободными местами")
+        admin_events = await admin.json("GET", "/events", params={"view": "card"})
+        export_id = max(admin_events, key=lambda event: event["members_count"])["id"]
+        cursor = await deep_cursor(args.page_depth)
+        deep_page = {"cursor": cursor} if cursor else {}
+
+        async def status_of(client: BenchmarkClient, method: str, path: str, **kwargs) -> int:
+            status_code, _ = await client.request(method, path, **kwargs)
+            return status_code
+
+        # join/leave и like/unlike меняют состояние пары (пользователь, событие): у каждого потока
+        # свои события, иначе параллельные запросы на одно событие дают ожидаемые 400 и портят цифры
+        stateful_concurrency = min(args.concurrency, len(open_ids))
+        if stateful_concurrency < args.concurrency:
+            print(f"join_leave/like_unlike: {len(open_ids)} open events, concurrency limited to {stateful_concurrency}")
+        worker_event_ids = [open_ids[number::stateful_concurrency] for number in range(stateful_concurrency)]
+
+        def worker_event(i: int, worker: int) -> int:
+            own = worker_event_ids[worker]
+            return own[i % len(own)]
+
+        async def join_leave(i: int, worker: int) -> int:
+            event_id = worker_event(i, worker)
+            joined = await status_of(user, "POST", f"/events/{event_id}/join")
+            left = await status_of(user, "GET", f"/events/{event_id}/leave")
+            return max(joined, left)
+
+        async def like_unlike(i: int, worker: int) -> int:
+            event_id = worker_event(i, worker)
+            liked = await status_of(user, "POST", f"/events/{event_id}/like")
+            unliked = await status_of(user, "DELETE", f"/events/{event_id}/unlike")
+            return max(liked, unliked)
+
+        credentials = {"email": args.user_email, "password": args.user_password}
+        scenarios: dict[str, tuple[Callable[[int, int], Awaitable[int]], int]] = {
+            "auth": (lambda i, worker: status_of(BenchmarkClient(), "POST", "/auth", json_body=credentials), args.requests),
+            "events": (lambda i, worker: status_of(user, "GET", "/events"), args.requests),
+            "events_card": (lambda i, worker: status_of(user, "GET", "/events", params={"view": "card"}), args.requests),
+            "events_city_open": (
+                lambda i, worker: status_of(user, "GET", "/events", params={"city": args.city, "status": "coming soon"}),
+                args.requests,
+            ),
+            "events_search": (lambda i, worker: status_of(user, "GET", "/events", params={"search": args.search}), args.requests),
+            "events_page": (lambda i, worker: status_of(user, "GET", "/events/page", params={"limit": 20}), args.requests),
+            "events_page_deep": (
+                lambda i, worker: status_of(admin, "GET", "/events/page", params={"limit": 20, **deep_page}),
+                args.requests,
+            ),
+            "events_page_search": (
+                lambda i, worker: status_of(user, "GET", "/events/page", params={"limit": 20, "search": args.search}),
+                args.requests,
+            ),
+            "admin_events": (lambda i, worker: status_of(admin, "GET", "/events"), args.requests),
+            "event_detail": (
+                lambda i, worker: status_of(user, "GET", f"/events/{rng.choice(event_ids)}"), args.requests,
+            ),
+            "join_leave": (join_leave, args.requests),
+            "like_unlike": (like_unlike, args.requests),
+            "notifications": (lambda i, worker: status_of(user, "GET", "/notifications"), args.requests),
+            "members_csv": (
+                lambda i, worker: status_of(admin, "GET", f"/events/{export_id}/members-csv"), args.export_requests,
+            ),
+            "members_excel": (
+                lambda i, worker: status_of(admin, "GET", f"/events/{export_id}/members-excel"), args.export_requests,
+            ),
+        }
+        concurrency = {"join_leave": stateful_concurrency, "like_unlike": stateful_concurrency}
+
+        results = {}
+        for name, (call, requests) in scenarios.items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = await run_scenario(
+                name, call, requests, concurrency.get(name, args.concurrency), args.warmup,
+            )
+    finally:
+        await engine.dispose()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"api-{commit}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f"results: {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,272 @@
+"""Генератор синтетических данных для нагрузочного тестирования.
+
+Заполняет базу пользователями, событиями, приглашениями, участниками, лайками
+и уведомлениями в объёмах, близких к боевым, и грузит их через COPY. Одно и то же
+зерно даёт одни и те же данные. Популярность событий распределена по Ципфу
+(--popularity-skew), доли городов и типов задаются весами.
+
+    python -m benchmarks.dataset --truncate --users 200000 --events 20000 \\
+        --invitations 5000000 --notifications 1000000 --city-weights MOSCOW=5,ST_PETERSBURG=3
+
+Пользователи получают пароль user123 (первые --admins - роль админа) и почты
+user<N>@synthetic.test. Нужна база с применёнными миграциями. --truncate очищает и
+fixture_state, поэтому демо-фикстуры загрузятся заново при следующем старте.
+"""
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional
+
+from sqlalchemy import text
+
+from events.enums.events import EventCity, EventStatus, EventType
+from main.db.db import engine
+from main.fixtures.users import USER_PASSWORD_HASH
+from notifications.enums.notifications import NotificationType
+
+TABLES = (
+    "notifications", "event_comments", "event_likes", "event_members", "event_waitlist", "event_invited_users",
+    "events", "email_outbox", "users", "fixture_state",
+)
+
+NAMES = ["Иван", "Мария", "Алексей", "Елена", "Дмитрий", "Анна", "Сергей", "Ольга", "Павел", "Наталья"]
+SURNAMES = ["Иванов", "Петров", "Сидоров", "Козлов", "Смирнов", "Волков", "Новиков", "Морозов", "Лебедев", "Соколов"]
+EVENT_WORDS = {
+    EventType.BIRTHDAY: "День рождения",
+    EventType.PARTY: "Вечеринка",
+    EventType.MEETING: "Встреча",
+    EventType.TRAINING: "Тренинг",
+    EventType.CONFERENCE: "Конференция",
+    EventType.WORKSHOP: "Мастер-класс",
+    EventType.SEMINAR: "Семинар",
+    EventType.CONCERT: "Концерт",
+    EventType.FESTIVAL: "Фестиваль",
+    EventType.EXCURSION: "Экскурсия",
+    EventType.TOUR: "Тур",
+    EventType.OTHER: "Событие",
+}
+DESCRIPTION = "Подробное описание события: программа, место проведения и условия участия. " * 4
+
+
+@dataclass
+class EventPlan:
+    id: int
+    invited: int
+    members: int
+    likes: int
+    max_members: Optional[int]
+
+
+def parse_weights(value: Optional[str], enum) -> tuple[list, list[float]]:
+    # "MOSCOW=5,KAZAN=1" -> только перечисленные значения с их весами; пусто - все поровну
+    if not value:
+        return list(enum), [1.0] * len(enum)
+    items, weights = [], []
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        items.append(enum[name.strip()])
+        weights.append(float(weight or 1))
+    return items, weights
+
+
+class DatasetGenerator:
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.now = datetime.now()
+        self.today = date.today()
+        self.cities, self.city_weights = parse_weights(args.city_weights, EventCity)
+        self.types, self.type_weights = parse_weights(args.type_weights, EventType)
+        self.plans: list[EventPlan] = []
+
+    def event_rng(self, event_id: int, salt: int = 0) -> random.Random:
+        # Отдельный генератор на событие: связи каждой таблицы можно пересчитать независимо
+        return random.Random(self.args.seed * 1_000_003 + event_id * 7 + salt)
+
+    def users(self, first_id: int) -> Iterator[tuple]:
+        rng = random.Random(self.args.seed)
+        for n in range(self.args.users):
+            user_id = first_id + n
+            yield (
+                user_id,
+                rng.choice(NAMES),
+                rng.choice(SURNAMES),
+                None,
+                f"user{user_id}@synthetic.test",
+                "ADMIN" if n < self.args.admins else "USER",
+                "ACTIVE",
+                USER_PASSWORD_HASH,
+                self.now,
+                self.now,
+            )
+
+    def events(self, first_id: int) -> Iterator[tuple]:
+        rng = random.Random(self.args.seed + 1)
+
+        # Ципф по случайно перемешанным рангам: популярные события не сбиты в начало id
+        ranks = list(range(1, self.args.events + 1))
+        rng.shuffle(ranks)
+        weights = [rank ** -self.args.popularity_skew for rank in ranks]
+        total_weight = sum(weights)
+
+        for n in range(self.args.events):
+            event_id = first_id + n
+            event_type = rng.choices(self.types, self.type_weights)[0]
+            city = rng.choices(self.cities, self.city_weights)[0]
+            start_date = self.today + timedelta(days=rng.randint(-self.args.days_back, self.args.days_ahead))
+            end_date = start_date + timedelta(days=rng.choice((0, 0, 0, 1, 2)))
+            if rng.random() < self.args.cancelled_share:
+                status = EventStatus.CANCELLED
+            elif end_date < self.today:
+                status = EventStatus.COMPLETED
+            elif start_date <= self.today:
+                status = EventStatus.ACTIVE
+            else:
+                status = EventStatus.COMING_SOON
+            max_members = rng.choice((None, 10, 20, 50, 100, 500, 1000))
+            invited = min(self.args.users, max(1, round(self.args.invitations * weights[n] / total_weight)))
+            members = round(invited * self.args.member_share)
+            if max_members is not None:
+                members = min(members, max_members)
+            likes = round(invited * self.args.like_share)
+            self.plans.append(
+                EventPlan(id=event_id, invited=invited, members=members, likes=likes, max_members=max_members)
+            )
+
+            yield (
+                event_id,
+                f"{EVENT_WORDS[event_type]} #{event_id}",
+                f"images/image{rng.randint(1, 10)}.png",
+                start_date,
+                end_date,
+                f"{EVENT_WORDS[event_type]} в городе {city.value}",
+                DESCRIPTION,
+                None,
+                max_members,
+                city.name,
+                f"Площадка {rng.randint(1, 500)}, {city.value}",
+                event_type.name,
+                status.name,
+                1,
+                members,
+                likes,
+                self.now,
+                self.now,
+            )
+
+    def invited(self, plan: EventPlan, first_user_id: int) -> list[int]:
+        rng = self.event_rng(plan.id)
+        return [first_user_id + n for n in rng.sample(range(self.args.users), plan.invited)]
+
+    def links(self, first_user_id: int, kind: str) -> Iterator[tuple]:
+        for plan in self.plans:
+            invited = self.invited(plan, first_user_id)
+            if kind == "invited":
+                user_ids = invited
+            elif kind == "members":
+                user_ids = invited[:plan.members]
+            else:
+                rng = self.event_rng(plan.id, salt=1)
+                user_ids = rng.sample(invited, plan.likes)
+            for user_id in user_ids:
+                yield plan.id, user_id
+
+    def notifications(self, first_id: int, first_user_id: int) -> Iterator[tuple]:
+        total_invited = sum(plan.invited for plan in self.plans) or 1
+        types = [NotificationType.EVENT_CREATED, NotificationType.EVENT_UPDATED, NotificationType.EVENT_REMINDER_24H]
+        notification_id = first_id
+        for plan in self.plans:
+            count = round(self.args.notifications * plan.invited / total_invited)
+            if not count:
+                continue
+            invited = self.invited(plan, first_user_id)
+            rng = self.event_rng(plan.id, salt=2)
+            for n in range(count):
+                created_at = self.now - timedelta(minutes=rng.randint(0, 60 * 24 * self.args.days_back))
+                yield (
+                    notification_id,
+                    invited[n % len(invited)],
+                    plan.id,
+                    types[n // len(invited) % len(types)].name,
+                    rng.random() < self.args.read_share,
+                    created_at,
+                    created_at,
+                )
+                notification_id += 1
+
+
+async def copy(connection, table: str, columns: tuple[str, ...], records: Iterator[tuple]) -> None:
+    started = time.perf_counter()
+    status = await connection.copy_records_to_table(table, records=records, columns=columns)
+    print(f"{table}: {status} ({time.perf_counter() - started:.1f}s)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--admins", type=int, default=10)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--invitations", type=int, default=5_000_000)
+    parser.add_argument("--member-share", type=float, default=0.4, help="доля приглашённых, вступивших в событие")
+    parser.add_argument("--like-share", type=float, default=0.2, help="доля приглашённых, лайкнувших событие")
+    parser.add_argument("--notifications", type=int, default=1_000_000)
+    parser.add_argument("--read-share", type=float, default=0.7, help="доля прочитанных уведомлений")
+    parser.add_argument("--popularity-skew", type=float, default=1.1, help="показатель Ципфа; 0 - равномерно")
+    parser.add_argument("--city-weights", help="например MOSCOW=5,ST_PETERSBURG=3,KAZAN=1")
+    parser.add_argument("--type-weights", help="например CONFERENCE=3,PARTY=2,OTHER=1")
+    parser.add_argument("--cancelled-share", type=float, default=0.03)
+    parser.add_argument("--days-back", type=int, default=180)
+    parser.add_argument("--days-ahead", type=int, default=180)
+    parser.add_argument("--truncate", action="store_true", help="очистить таблицы перед загрузкой")
+    args = parser.parse_args()
+
+    generator = DatasetGenerator(args)
+    started = time.perf_counter()
+    try:
+        async with engine.begin() as conn:
+            if args.truncate:
+                await conn.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY"))
+            first_user_id = (await conn.execute(text("SELECT coalesce(max(id), 0) + 1 FROM users"))).scalar()
+            first_event_id = (await conn.execute(text("SELECT coalesce(max(id), 0) + 1 FROM events"))).scalar()
+            first_notification_id = (
+                await conn.execute(text("SELECT coalesce(max(id), 0) + 1 FROM notifications"))
+            ).scalar()
+
+            raw_connection = await conn.get_raw_connection()
+            connection = raw_connection.driver_connection
+
+            await copy(connection, "users", (
+                "id", "name", "surname", "father_name", "email", "role", "status", "hashed_password",
+                "created_at", "updated_at",
+            ), generator.users(first_user_id))
+            await copy(connection, "events", (
+                "id", "name", "image_url", "start_date", "end_date", "short_description", "description",
+                "pay_data", "max_members", "city", "location", "type", "status", "version", "members_count",
+                "likes_count", "created_at", "updated_at",
+            ), generator.events(first_event_id))
+            for table, kind in (("event_invited_users", "invited"), ("event_members", "members"), ("event_likes", "likes")):
+                await copy(connection, table, ("event_id", "user_id"), generator.links(first_user_id, kind))
+            await copy(connection, "notifications", (
+                "id", "user_id", "event_id", "type", "is_read", "created_at", "updated_at",
+            ), generator.notifications(first_notification_id, first_user_id))
+
+            # id заданы явно, поэтому последовательности нужно догнать вручную
+            for table in ("users", "events", "notifications"):
+                await conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+                ))
+
+        # Статистика для планировщика сразу после загрузки, иначе первые прогоны пойдут по старым оценкам
+        async with engine.begin() as conn:
+            await conn.execute(text(f"ANALYZE {', '.join(TABLES)}"))
+        print(f"done in {time.perf_counter() - started:.1f}s")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
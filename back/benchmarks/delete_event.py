@@ -0,0 +1,123 @@
+"""Бенчмарк удаления события с большим числом участников.
+
+Создаёт --events событий, в каждом --members временных пользователей с
+приглашениями, участием, частью лайков, отзывов и уведомлений, затем удаляет
+события через EventsService.delete_event и проверяет, что зависимых строк не
+осталось. Временные пользователи удаляются в конце. Нужна база с применёнными
+миграциями.
+
+    python -m benchmarks.delete_event --members 10000 --events 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, insert, select, text
+
+from events.enums.events import EventStatus, EventType
+from events.models.events import Event, EventComments, EventInvitedUsers, EventLikes, EventMembers, EventWaitlist
+from events.services.events import EventsService
+from main.db.db import SessionLocal, engine
+from main.fixtures.users import USER_PASSWORD_HASH
+from notifications.models.notifications import Notification
+from users.models.user import User
+
+EMAIL_DOMAIN = "delete-event.test"
+DEPENDENT_MODELS = (EventMembers, EventWaitlist, EventLikes, EventInvitedUsers, EventComments, Notification)
+
+FILL_EVENT = text("""
+    WITH users AS (SELECT unnest(CAST(:user_ids AS bigint[])) AS id),
+    invited AS (INSERT INTO event_invited_users (event_id, user_id) SELECT :event_id, id FROM users),
+    members AS (INSERT INTO event_members (event_id, user_id) SELECT :event_id, id FROM users),
+    likes AS (INSERT INTO event_likes (event_id, user_id) SELECT :event_id, id FROM users WHERE id % 3 = 0),
+    comments AS (
+        INSERT INTO event_comments (event_id, user_id, comment, rating)
+        SELECT :event_id, id, 'Отзыв участника', 5 FROM users WHERE id % 10 = 0
+    )
+    INSERT INTO notifications (user_id, event_id, type, is_read, created_at, updated_at)
+    SELECT id, :event_id, 'EVENT_CREATED', false, now(), now() FROM users
+""")
+
+
+async def create_users(members: int) -> list[int]:
+    async with SessionLocal() as session:
+        # executemany + RETURNING: SQLAlchemy бьёт вставку на пачки, не упираясь в лимит параметров
+        result = await session.execute(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                {"name": "Удаление", "surname": "Тестов", "email": f"member{n}@{EMAIL_DOMAIN}", "hashed_password": USER_PASSWORD_HASH}
+                for n in range(members)
+            ],
+        )
+        await session.commit()
+        return list(result.scalars().all())
+
+
+async def create_event(user_ids: list[int]) -> int:
+    async with SessionLocal() as session:
+        event_id = (await session.execute(
+            insert(Event)
+            .values(
+                name="Проверка удаления",
+                image_url="images/image1.png",
+                start_date=date.today() + timedelta(days=7),
+                end_date=date.today() + timedelta(days=7),
+                description="Временное событие для бенчмарка удаления",
+                type=EventType.OTHER,
+                status=EventStatus.COMING_SOON,
+                members_count=len(user_ids),
+                likes_count=len([user_id for user_id in user_ids if user_id % 3 == 0]),
+            )
+            .returning(Event.id)
+        )).scalar_one()
+        await session.execute(FILL_EVENT, {"event_id": event_id, "user_ids": user_ids})
+        await session.commit()
+        return event_id
+
+
+async def count_dependents(event_ids: list[int]) -> int:
+    async with SessionLocal() as session:
+        total = 0
+        for model in DEPENDENT_MODELS:
+            total += await session.scalar(
+                select(func.count()).select_from(model).where(model.event_id.in_(event_ids))
+            )
+        return total
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=5)
+    args = parser.parse_args()
+
+    user_ids = await create_users(args.members)
+    try:
+        timings = []
+        event_ids = []
+        for _ in range(args.events):
+            event_id = await create_event(user_ids)
+            event_ids.append(event_id)
+
+            async with SessionLocal() as session:
+                started = time.perf_counter()
+                await EventsService.delete_event(session, event_id)
+                timings.append((time.perf_counter() - started) * 1000)
+
+        leftovers = await count_dependents(event_ids)
+        print(
+            f"members={args.members} events={args.events} "
+            f"median_ms={statistics.median(timings):.1f} max_ms={max(timings):.1f} leftovers={leftovers}"
+        )
+        assert leftovers == 0, f"{leftovers} dependent rows left after delete"
+    finally:
+        async with SessionLocal() as session:
+            await session.execute(delete(User).where(User.id.in_(user_ids)))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,164 @@
+"""Время чтения события в зависимости от числа участников.
+
+Для каждого размера из --sizes создаёт событие с N участниками, N приглашёнными и
+N/3 лайками и --repeat раз замеряет пути чтения, которые не должны зависеть от N:
+
+- stats: карточка события с members_count, likes_count, is_user_in_event и
+  is_user_liked_event (EventsService.with_stats);
+- by_id: EventsService.get_event_by_id, используется при комментировании и в админке;
+- is_member: проверка участия перед отзывом (EventsService.is_user_member);
+
+и для сравнения legacy - прежнее чтение с selectinload участников, лайков и
+приглашённых и проверкой флагов перебором в Python. Скрипт падает, если медиана
+любого из первых трёх путей на самом большом событии больше медианы на самом
+маленьком в --max-ratio раз (плюс --slack-ms на шум). Нужна база с применёнными
+миграциями, временные пользователи и события удаляются в конце.
+
+    python -m benchmarks.event_size --sizes 10 1000 10000 50000 --repeat 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import BigInteger, any_, bindparam, delete, insert, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import selectinload
+
+from events.enums.events import EventStatus, EventType, EventView
+from events.models.events import Event
+from events.services.events import EventsService
+from main.db.db import SessionLocal, engine
+from main.fixtures.users import USER_PASSWORD_HASH
+from users.models.user import User
+
+EMAIL_DOMAIN = "event-size.test"
+
+FILL_EVENT = text("""
+    WITH users AS (SELECT unnest(CAST(:user_ids AS bigint[])) AS id),
+    invited AS (INSERT INTO event_invited_users (event_id, user_id) SELECT :event_id, id FROM users),
+    likes AS (INSERT INTO event_likes (event_id, user_id) SELECT :event_id, id FROM users WHERE id % 3 = 0)
+    INSERT INTO event_members (event_id, user_id) SELECT :event_id, id FROM users
+""")
+
+
+async def create_users(count: int) -> list[int]:
+    async with SessionLocal() as session:
+        # executemany + RETURNING: SQLAlchemy бьёт вставку на пачки, не упираясь в лимит параметров
+        result = await session.execute(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                {"name": "Размер", "surname": "Тестов", "email": f"member{n}@{EMAIL_DOMAIN}", "hashed_password": USER_PASSWORD_HASH}
+                for n in range(count)
+            ],
+        )
+        await session.commit()
+        return list(result.scalars().all())
+
+
+async def create_event(user_ids: list[int]) -> int:
+    async with SessionLocal() as session:
+        event_id = (await session.execute(
+            insert(Event)
+            .values(
+                name=f"Событие на {len(user_ids)} участников",
+                image_url="images/image1.png",
+                start_date=date.today() + timedelta(days=7),
+                end_date=date.today() + timedelta(days=7),
+                description="Временное событие для бенчмарка размера",
+                type=EventType.OTHER,
+                status=EventStatus.COMING_SOON,
+                members_count=len(user_ids),
+                likes_count=len([user_id for user_id in user_ids if user_id % 3 == 0]),
+            )
+            .returning(Event.id)
+        )).scalar_one()
+        await session.execute(FILL_EVENT, {"event_id": event_id, "user_ids": user_ids})
+        await session.execute(text("ANALYZE event_members, event_likes, event_invited_users"))
+        await session.commit()
+        return event_id
+
+
+async def read_stats(session, event_id: int, user_id: int):
+    query = EventsService.with_view(select(Event).where(Event.id == event_id), EventView.CARD)
+    event = (await session.execute(EventsService.with_stats(query, user_id))).scalar_one()
+    return event.members_count, event.likes_count, event.is_user_in_event, event.is_user_liked_event
+
+
+async def read_by_id(session, event_id: int, user_id: int):
+    return await EventsService.get_event_by_id(session, event_id)
+
+
+async def read_is_member(session, event_id: int, user_id: int):
+    return await EventsService.is_user_member(session, event_id, user_id)
+
+
+async def read_legacy(session, event_id: int, user_id: int):
+    result = await session.execute(
+        select(Event)
+        .options(selectinload(Event.members), selectinload(Event.likes), selectinload(Event.invited_users))
+        .where(Event.id == event_id)
+    )
+    event = result.scalar_one()
+    return (
+        len(event.members),
+        len(event.likes),
+        user_id in [member.id for member in event.members],
+        user_id in [user.id for user in event.likes],
+    )
+
+
+PATHS = {"stats": read_stats, "by_id": read_by_id, "is_member": read_is_member, "legacy": read_legacy}
+FLAT_PATHS = ("stats", "by_id", "is_member")
+
+
+async def measure(read, event_id: int, user_id: int, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        async with SessionLocal() as session:
+            started = time.perf_counter()
+            await read(session, event_id, user_id)
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    parser.add_argument("--slack-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    sizes = sorted(args.sizes)
+
+    user_ids = await create_users(sizes[-1])
+    event_ids = []
+    try:
+        medians = {}
+        for size in sizes:
+            members = user_ids[:size]
+            event_id = await create_event(members)
+            event_ids.append(event_id)
+            for name, read in PATHS.items():
+                medians[name, size] = await measure(read, event_id, members[-1], args.repeat)
+            print(f"members={size:<7} " + " ".join(f"{name}={medians[name, size]:.2f}ms" for name in PATHS))
+
+        for name in FLAT_PATHS:
+            smallest, largest = medians[name, sizes[0]], medians[name, sizes[-1]]
+            allowed = smallest * args.max_ratio + args.slack_ms
+            assert largest <= allowed, (
+                f"{name}: {largest:.2f}ms at {sizes[-1]} members vs {smallest:.2f}ms at {sizes[0]}"
+            )
+        print(f"ok: {', '.join(FLAT_PATHS)} stay flat from {sizes[0]} to {sizes[-1]} members")
+    finally:
+        async with SessionLocal() as session:
+            for event_id in event_ids:
+                await EventsService.delete_event(session, event_id)
+            await session.execute(delete(User).where(User.id == any_(bindparam("user_ids", user_ids, type_=ARRAY(BigInteger)))))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
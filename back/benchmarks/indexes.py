@@ -0,0 +1,148 @@
+"""Бенчмарк набора индексов таблицы events: запись и типовые чтения.
+
+Создаёт в схеме bench копию events, навешивает старый или новый набор индексов,
+вставляет и обновляет строки и гоняет запросы ленты. Нужна база с созданной схемой
+приложения (DATABASE_URL из настроек).
+
+    python -m benchmarks.indexes --rows 100000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from main.db.db import engine
+
+COMMON_INDEXES = [
+    "CREATE INDEX ON bench.events USING gin (search_vector)",
+    "CREATE INDEX ON bench.events USING gin (name gin_trgm_ops)",
+    "CREATE INDEX ON bench.events (start_date, id)",
+]
+
+INDEX_SETS = {
+    "before": COMMON_INDEXES + [
+        f"CREATE INDEX ON bench.events ({column})"
+        for column in (
+            "id", "name", "image_url", "start_date", "end_date", "short_description", "description",
+            "city", "type", "status",
+        )
+    ] + [
+        f"CREATE INDEX ON bench.events ({column})"
+        for column in ("name", "image_url", "start_date", "end_date", "status", "city")
+    ],
+    "after": COMMON_INDEXES + [
+        "CREATE INDEX ON bench.events (start_date, id) WHERE status <> 'COMPLETED' AND status <> 'CANCELLED'",
+        "CREATE INDEX ON bench.events (end_date)",
+        "CREATE INDEX ON bench.events (status)",
+        "CREATE INDEX ON bench.events (city)",
+        "CREATE INDEX ON bench.events (type)",
+    ],
+}
+
+INSERT_BATCH = text("""
+    INSERT INTO bench.events (
+        id, name, image_url, start_date, end_date, short_description, description,
+        city, type, status, version, created_at, updated_at
+    )
+    SELECT
+        n,
+        'Событие номер ' || n,
+        '/images/image' || (n % 10 + 1) || '.png',
+        current_date + (n % 365),
+        current_date + (n % 365) + 1,
+        'Короткое описание события ' || n,
+        repeat('Подробное описание события, программа и место проведения. ', 15),
+        (ARRAY['MOSCOW', 'ST_PETERSBURG', 'KAZAN', 'MINSK']::eventcity[])[n % 4 + 1],
+        (ARRAY['MEETING', 'PARTY', 'CONFERENCE', 'OTHER']::eventtype[])[n % 4 + 1],
+        (ARRAY['COMING_SOON', 'ACTIVE', 'COMPLETED', 'CANCELLED']::eventstatus[])[n % 4 + 1],
+        1, now(), now()
+    FROM generate_series(:start, :stop) AS n
+""")
+
+UPDATE_BATCH = text("""
+    UPDATE bench.events SET version = version + 1, updated_at = now()
+    WHERE id IN (SELECT (random() * :rows)::bigint FROM generate_series(1, :count))
+""")
+
+READ_QUERIES = {
+    "feed": text("""
+        SELECT * FROM bench.events
+        WHERE status <> 'COMPLETED' AND status <> 'CANCELLED' AND (start_date, id) > (current_date + 180, 0)
+        ORDER BY start_date, id LIMIT 20
+    """),
+    "feed_city": text("""
+        SELECT * FROM bench.events
+        WHERE status <> 'COMPLETED' AND status <> 'CANCELLED' AND city = 'KAZAN'
+        ORDER BY start_date, id LIMIT 20
+    """),
+    "completed": text("""
+        SELECT * FROM bench.events WHERE status = 'COMPLETED' ORDER BY start_date, id LIMIT 20
+    """),
+}
+
+
+async def run_variant(name: str, rows: int, batch: int, reads: int) -> dict:
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA IF EXISTS bench CASCADE"))
+        await conn.execute(text("CREATE SCHEMA bench"))
+        await conn.execute(text(
+            "CREATE TABLE bench.events (LIKE public.events INCLUDING DEFAULTS INCLUDING GENERATED)"
+        ))
+        await conn.execute(text("ALTER TABLE bench.events ADD PRIMARY KEY (id)"))
+        for statement in INDEX_SETS[name]:
+            await conn.execute(text(statement))
+
+    started = time.perf_counter()
+    for start in range(1, rows + 1, batch):
+        async with engine.begin() as conn:
+            await conn.execute(INSERT_BATCH, {"start": start, "stop": min(start + batch - 1, rows)})
+    insert_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(rows // batch):
+        async with engine.begin() as conn:
+            await conn.execute(UPDATE_BATCH, {"rows": rows, "count": batch})
+    update_seconds = time.perf_counter() - started
+
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE bench.events"))
+        size = (await conn.execute(text("SELECT pg_total_relation_size('bench.events')"))).scalar()
+
+    result = {
+        "variant": name,
+        "inserts_per_second": rows / insert_seconds,
+        "updates_per_second": rows / update_seconds,
+        "total_size_mb": size / 1024 / 1024,
+    }
+    async with engine.connect() as conn:
+        for query_name, query in READ_QUERIES.items():
+            timings = []
+            for _ in range(reads):
+                started = time.perf_counter()
+                (await conn.execute(query)).all()
+                timings.append((time.perf_counter() - started) * 1000)
+            result[f"{query_name}_ms"] = statistics.median(timings)
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=1_000)
+    parser.add_argument("--reads", type=int, default=50)
+    args = parser.parse_args()
+
+    try:
+        for name in INDEX_SETS:
+            result = await run_variant(name, args.rows, args.batch, args.reads)
+            print(" ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in result.items()))
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP SCHEMA IF EXISTS bench CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
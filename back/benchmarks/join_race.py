@@ -0,0 +1,126 @@
+"""Проверка join под конкурентной нагрузкой: нет переполнения при одновременных запросах.
+
+Создаёт событие с --capacity местами, приглашает --joins временных пользователей и
+запускает все join одновременно, каждый в своей сессии. Затем сверяет, что
+участников ровно min(capacity, joins), счётчик events.members_count совпадает
+с таблицей event_members, а все остальные встали в очередь ожидания. Временные
+данные удаляются в конце. Нужна база с применёнными миграциями.
+
+    python -m benchmarks.join_race --joins 1000 --capacity 100
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from events.enums.events import EventStatus, EventType
+from events.models.events import Event, EventInvitedUsers, EventMembers, EventWaitlist
+from events.services.events import EventsService
+from main.config.settings import settings
+from main.fixtures.users import USER_PASSWORD_HASH
+from notifications.models.outbox import EmailOutbox
+from users.models.user import User
+
+EMAIL_DOMAIN = "join-race.test"
+
+
+async def prepare(session: AsyncSession, joins: int, capacity: int) -> tuple[int, list[int]]:
+    result = await session.execute(
+        insert(User)
+        .values([
+            {"name": "Гонка", "surname": "Тестов", "email": f"race{n}@{EMAIL_DOMAIN}", "hashed_password": USER_PASSWORD_HASH}
+            for n in range(joins)
+        ])
+        .returning(User.id)
+    )
+    user_ids = list(result.scalars().all())
+    event_id = (await session.execute(
+        insert(Event)
+        .values(
+            name="Проверка вместимости",
+            image_url="images/image1.png",
+            start_date=date.today() + timedelta(days=7),
+            end_date=date.today() + timedelta(days=7),
+            description="Временное событие для проверки конкурентного join",
+            max_members=capacity,
+            type=EventType.OTHER,
+            status=EventStatus.COMING_SOON,
+        )
+        .returning(Event.id)
+    )).scalar_one()
+    await session.execute(
+        insert(EventInvitedUsers).values([{"event_id": event_id, "user_id": user_id} for user_id in user_ids])
+    )
+    await session.commit()
+    return event_id, user_ids
+
+
+async def cleanup(session: AsyncSession, event_id: int, user_ids: list[int]) -> None:
+    await session.execute(delete(EventMembers).where(EventMembers.event_id == event_id))
+    await session.execute(delete(EventWaitlist).where(EventWaitlist.event_id == event_id))
+    await session.execute(delete(EventInvitedUsers).where(EventInvitedUsers.event_id == event_id))
+    await session.execute(delete(Event).where(Event.id == event_id))
+    await session.execute(delete(User).where(User.id.in_(user_ids)))
+    # Письма админам о тестовых вступлениях отправлять не нужно
+    event_url = f"{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event_id)}"
+    await session.execute(delete(EmailOutbox).where(EmailOutbox.payload["event_url"].astext == event_url))
+    await session.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--joins", type=int, default=1_000)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.DATABASE_URL, pool_size=args.pool_size, max_overflow=0)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with sessions() as session:
+        event_id, user_ids = await prepare(session, args.joins, args.capacity)
+
+    async def join(user_id: int) -> str:
+        # Сервису от пользователя нужны только id и имя для письма админам
+        async with sessions() as session:
+            try:
+                membership = await EventsService.join_event(session, event_id, SimpleNamespace(id=user_id, name="Гонка"))
+                return "joined" if membership.joined else "waitlisted"
+            except HTTPException as e:
+                return e.detail
+
+    try:
+        started = time.perf_counter()
+        outcomes = Counter(await asyncio.gather(*(join(user_id) for user_id in user_ids)))
+        elapsed = time.perf_counter() - started
+
+        async with sessions() as session:
+            members = await session.scalar(
+                select(func.count()).select_from(EventMembers).where(EventMembers.event_id == event_id)
+            )
+            members_count = await session.scalar(select(Event.members_count).where(Event.id == event_id))
+            waitlist = await session.scalar(
+                select(func.count()).select_from(EventWaitlist).where(EventWaitlist.event_id == event_id)
+            )
+
+        print(f"{args.joins} joins in {elapsed:.2f}s: {dict(outcomes)}; members={members} members_count={members_count} waitlist={waitlist}")
+        expected = min(args.capacity, args.joins)
+        assert members == expected, f"expected {expected} members, got {members}"
+        assert members_count == members, f"members_count {members_count} != event_members {members}"
+        assert outcomes["joined"] == expected and outcomes["waitlisted"] == args.joins - expected, outcomes
+        assert waitlist == args.joins - expected, f"expected {args.joins - expected} waiting, got {waitlist}"
+        print("ok: no overbooking")
+    finally:
+        async with sessions() as session:
+            await cleanup(session, event_id, user_ids)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""Микробенчмарк кодирования списка событий.
+
+Сравнивает старый путь (model_validate + model_copy на каждое событие, затем
+повторная валидация по response_model и jsonable_encoder + json.dumps, как это
+делает FastAPI) с новым (одна валидация через TypeAdapter и dump_json).
+
+    python -m benchmarks.serialization --events 1000 --members 10
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from events.enums.events import EventCity, EventStatus, EventType
+from events.routers.events import EVENTS_ADAPTER, encode_events
+from events.schemas.responses import EventResponse
+from users.enums.user import UserRole
+
+
+def make_events(events_count: int, members_count: int) -> list[SimpleNamespace]:
+    members = [
+        SimpleNamespace(
+            id=user_id,
+            name="Иван",
+            surname="Иванов",
+            father_name="Иванович",
+            email=f"user{user_id}@example.com",
+            role=UserRole.USER,
+        )
+        for user_id in range(members_count)
+    ]
+    today = date.today()
+    return [
+        SimpleNamespace(
+            id=event_id,
+            name=f"Событие {event_id}",
+            image_url=f"/images/image{event_id % 10 + 1}.png",
+            start_date=today + timedelta(days=event_id % 60),
+            end_date=today + timedelta(days=event_id % 60 + 1),
+            short_description="Короткое описание события",
+            description="Подробное описание события " * 10,
+            location="ул. Пушкина, д. 1",
+            pay_data=None,
+            max_members=100,
+            status=EventStatus.COMING_SOON,
+            city=EventCity.MOSCOW,
+            type=EventType.MEETING,
+            members=members,
+            members_count=members_count,
+            likes_count=3,
+            is_user_in_event=event_id % 2 == 0,
+            is_user_liked_event=event_id % 3 == 0,
+        )
+        for event_id in range(events_count)
+    ]
+
+
+def encode_before(events: list[SimpleNamespace]) -> bytes:
+    result = []
+    for event in events:
+        event_response = EventResponse.model_validate(event)
+        result.append(event_response.model_copy(update={
+            'is_user_in_event': event.is_user_in_event,
+            'is_user_liked_event': event.is_user_liked_event,
+        }))
+    # FastAPI: дамп в dict, валидация по response_model, jsonable_encoder, json.dumps
+    validated = EVENTS_ADAPTER.validate_python([item.model_dump() for item in result])
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False).encode("utf-8")
+
+
+def encode_after(events: list[SimpleNamespace]) -> bytes:
+    return encode_events(EVENTS_ADAPTER.validate_python(events, from_attributes=True))
+
+
+def measure(func, events, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(events)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    events = make_events(args.events, args.members)
+    assert json.loads(encode_before(events)) == json.loads(encode_after(events))
+
+    for label, func in (("before", encode_before), ("after", encode_after)):
+        timings = measure(func, events, args.repeat)
+        print(
+            f"{label:>6}: median {statistics.median(timings):8.2f} ms, "
+            f"min {min(timings):8.2f} ms, payload {len(func(events)) / 1024:.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
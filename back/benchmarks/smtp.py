@@ -0,0 +1,106 @@
+"""Пропускная способность отправки писем через пул SMTP-соединений.
+
+Поднимает локальный aiosmtpd (в своём потоке, письма только считаются) и отправляет
+--messages писем в --concurrency параллельных задач двумя способами: через SmtpPool
+размера --pool-size и по соединению на письмо, как раньше (max_messages=1). Затем
+перезапускает сервер, чтобы все соединения пула оборвались, и проверяет, что пул
+переподключается и письма доходят.
+
+    pip install aiosmtpd
+    python -m benchmarks.smtp --messages 5000 --concurrency 50 --pool-size 5
+"""
+import argparse
+import asyncio
+import time
+from email.mime.text import MIMEText
+
+from aiosmtpd.controller import Controller
+
+from notifications.services.smtp import SmtpPool
+
+
+class CountingHandler:
+
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def build_message(n: int) -> MIMEText:
+    message = MIMEText(f"<p>Письмо {n}</p>" * 50, "html", "utf-8")
+    message["From"] = "Benchmark <noreply@smtp-benchmark.test>"
+    message["To"] = f"user{n}@smtp-benchmark.test"
+    message["Subject"] = "Проверка пула"
+    return message
+
+
+async def send_all(pool: SmtpPool, messages: int, concurrency: int) -> float:
+    counter = iter(range(messages))
+
+    async def worker():
+        for n in counter:
+            await pool.send_message(build_message(n))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+def make_pool(args: argparse.Namespace, size: int, max_messages: int) -> SmtpPool:
+    return SmtpPool(
+        hostname=args.host, port=args.port, start_tls=False, size=size, max_messages=max_messages,
+        health_check_after=args.health_check_after,
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-messages", type=int, default=1_000, help="писем на соединение пула")
+    parser.add_argument("--health-check-after", type=float, default=15)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    handler = CountingHandler()
+    controller = Controller(handler, hostname=args.host, port=args.port)
+    controller.start()
+    try:
+        for name, pool in (
+            ("pooled", make_pool(args, args.pool_size, args.max_messages)),
+            ("per-message", make_pool(args, args.pool_size, 1)),
+        ):
+            received = handler.received
+            elapsed = await send_all(pool, args.messages, args.concurrency)
+            await pool.close()
+            delivered = handler.received - received
+            print(
+                f"{name:<12} messages={delivered} connects={pool.connects} "
+                f"elapsed={elapsed:.2f}s throughput={delivered / elapsed:.0f}/s"
+            )
+            assert delivered == args.messages, f"{name}: {delivered} of {args.messages} delivered"
+
+        # Обрыв всех соединений пула: сервер перезапускается, пока они простаивают
+        pool = make_pool(args, args.pool_size, args.max_messages)
+        await send_all(pool, args.pool_size * 10, args.pool_size)
+        controller.stop()
+        controller = Controller(handler, hostname=args.host, port=args.port)
+        controller.start()
+        received = handler.received
+        await send_all(pool, args.pool_size * 10, args.pool_size)
+        await pool.close()
+        delivered = handler.received - received
+        print(f"after restart: messages={delivered} connects={pool.connects} reconnects={pool.reconnects}")
+        assert delivered == args.pool_size * 10, f"{delivered} delivered after server restart"
+        print("ok: pool reconnects after dropped connections")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -43,3 +43,8 @@ class EventCity(Enum):
     VITEBSK = "Витебск"
     GRODNO = "Гродно"
     MOGILEV = "Могилев"
+
+
+class EventView(Enum):
+    CARD = "card"
+    DETAIL = "detail"
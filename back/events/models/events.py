@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Date, Enum, ForeignKey, Index, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Computed, Date, Enum, ForeignKey, Index, Integer, String, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, query_expression, relationship
 
 from events.enums.events import EventCity, EventStatus, EventType
 from main.models.base import Base, BaseModel
@@ -8,8 +9,8 @@ from main.models.base import Base, BaseModel
 class EventMembers(Base):
     __tablename__ = "event_members"
     __table_args__ = (
-        Index("idx_event_members_event_id", "event_id"),
-        Index("idx_event_members_user_id", "user_id"),
+        # Выборки по event_id обслуживает PK (event_id, user_id), по user_id - обратный составной индекс
+        Index("idx_event_members_user_id_event_id", "user_id", "event_id"),
     )
 
     event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
@@ -19,8 +20,8 @@ class EventMembers(Base):
 class EventInvitedUsers(Base):
     __tablename__ = "event_invited_users"
     __table_args__ = (
-        Index("idx_event_invited_users_event_id", "event_id"),
-        Index("idx_event_invited_users_user_id", "user_id"),
+        # Выборки по event_id обслуживает PK (event_id, user_id), по user_id - обратный составной индекс
+        Index("idx_event_invited_users_user_id_event_id", "user_id", "event_id"),
     )
 
     event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
@@ -30,20 +31,28 @@ class EventInvitedUsers(Base):
 class EventLikes(Base):
     __tablename__ = "event_likes"
     __table_args__ = (
-        Index("idx_event_likes_event_id", "event_id"),
-        Index("idx_event_likes_user_id", "user_id"),
+        # Выборки по event_id обслуживает PK (event_id, user_id), по user_id - обратный составной индекс
+        Index("idx_event_likes_user_id_event_id", "user_id", "event_id"),
     )
 
     event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
 
-class EventComments(Base):
-    __tablename__ = "event_comments"
+
+class EventWaitlist(BaseModel):
+    __tablename__ = "event_waitlist"
     __table_args__ = (
-        Index("idx_event_comments_event_id", "event_id"),
-        Index("idx_event_comments_user_id", "user_id"),
+        UniqueConstraint("event_id", "user_id", name="uq_event_waitlist_event_id_user_id"),
+        # Голова очереди события: первый ожидающий по id
+        Index("idx_event_waitlist_event_id_id", "event_id", "id"),
     )
 
+    event_id = Column(BigInteger, ForeignKey("events.id"), nullable=False)
+    user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
+
+
+class EventComments(Base):
+    __tablename__ = "event_comments"
     event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
     comment = Column(String(1024), nullable=False)
@@ -55,35 +64,62 @@ class EventComments(Base):
 class Event(BaseModel):
     __tablename__ = "events"
     __table_args__ = (
-        Index("idx_event_name", "name"),
-        Index("idx_event_image_url", "image_url"),
-        Index("idx_event_start_date", "start_date"),
+        Index("idx_event_start_date_id", "start_date", "id"),
+        # Основная лента пользователя: исключены завершённые и отменённые события
+        Index(
+            "idx_event_open_start_date_id", "start_date", "id",
+            postgresql_where=text("status <> 'COMPLETED' AND status <> 'CANCELLED'"),
+        ),
         Index("idx_event_end_date", "end_date"),
         Index("idx_event_status", "status"),
         Index("idx_event_city", "city"),
+        Index("idx_event_type", "type"),
+        Index("idx_event_search_vector", "search_vector", postgresql_using="gin"),
+        Index("idx_event_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
     )
 
-    name = Column(String(128), nullable=False, index=True)
-    image_url = Column(String(1024), nullable=False, index=True)
+    name = Column(String(128), nullable=False)
+    image_url = Column(String(1024), nullable=False)
 
-    start_date = Column(Date, nullable=True, index=True)
-    end_date = Column(Date, nullable=False, index=True)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
 
-    short_description = Column(String(128), nullable=True, index=True)
-    description = Column(String(1024), nullable=False, index=True)
+    short_description = Column(String(128), nullable=True)
+    description = Column(String(1024), nullable=False)
 
     pay_data = Column(String(2048), nullable=True)
 
     max_members = Column(Integer, nullable=True)
 
-    city = Column(Enum(EventCity), nullable=True, index=True)
+    city = Column(Enum(EventCity), nullable=True)
     location = Column(String(512), nullable=True)
-    type = Column(Enum(EventType), nullable=False, index=True, default=EventType.OTHER)
+    type = Column(Enum(EventType), nullable=False, default=EventType.OTHER)
+
+    # Полнотекстовый индекс по названию и описаниям (русская морфология), веса A/B/C
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('russian'::regconfig, coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('russian'::regconfig, coalesce(short_description, '')), 'B') || "
+            "setweight(to_tsvector('russian'::regconfig, coalesce(description, '')), 'C')",
+            persisted=True,
+        ),
+    ))
 
     members = relationship("User", secondary=EventMembers.__table__, back_populates="events")
-    status = Column(Enum(EventStatus), index=True, default=EventStatus.COMING_SOON)
+    status = Column(Enum(EventStatus), default=EventStatus.COMING_SOON)
+    # Увеличивается при любом изменении события, его участников или лайков; основа ETag
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
+    # Счётчики поддерживаются join/leave и like/unlike в той же транзакции, расхождения чинит
+    # EventsService.reconcile_counters. join проверяет вместимость по members_count под блокировкой строки
+    members_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    likes_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
 
     likes = relationship("User", secondary=EventLikes.__table__, back_populates="liked_events")
     comments = relationship("EventComments", back_populates="event")
     notifications_relation = relationship("Notification", back_populates="event")
     invited_users = relationship("User", secondary=EventInvitedUsers.__table__, back_populates="invited_events")
+
+    # Заполняются коррелированными подзапросами через EventsService.with_stats
+    is_user_in_event = query_expression()
+    is_user_liked_event = query_expression()
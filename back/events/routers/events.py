@@ -1,143 +1,281 @@
-from asyncio import create_task
 from datetime import date
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from events.enums.events import EventCity, EventStatus, EventType
+from events.enums.events import EventCity, EventStatus, EventType, EventView
+from events.models.events import Event
 from events.schemas.requests import EventCommentRequest
-from events.schemas.responses import EventResponse
+from events.schemas.responses import (
+    EventCardResponse,
+    EventLikeResponse,
+    EventMembershipResponse,
+    EventResponse,
+    EventsPageResponse,
+    EventWaitlistResponse,
+)
+from events.services.cache import events_cache
 from events.services.events import EventsService
 from main.config.settings import settings
-from main.db.db import SessionDependency
-from notifications.services.email import EmailService
+from main.db.db import SessionDependency, SessionLocal
+from main.http.etag import etag_matches, make_etag, not_modified
+from main.http.ndjson import NDJSON_MEDIA_TYPE, wants_ndjson
 from users.dependencies.users import user_dependency
 from users.enums.user import UserRole
 from users.models.user import User
-from users.services.users import UsersService
+from users.schemas.responses import UserPreviewResponse
 from admin.dependencies.admin import admin_dependency
 from admin.schemas.responses import EventCommentAdminResponse
 router = APIRouter()
 
 
-@router.get("/events", response_model=list[EventResponse], status_code=status.HTTP_200_OK)
+EVENTS_ADAPTER = TypeAdapter(list[EventResponse])
+EVENT_CARDS_ADAPTER = TypeAdapter(list[EventCardResponse])
+EVENTS_PAGE_ADAPTER = TypeAdapter(EventsPageResponse)
+
+
+async def events_to_responses(
+    session: AsyncSession,
+    events: List[Event],
+    view: EventView = EventView.DETAIL,
+) -> list[EventResponse] | list[EventCardResponse]:
+    # Счётчики и флаги пользователя уже посчитаны в SQL (EventsService.with_stats),
+    # поэтому список валидируется один раз целиком, без model_copy на каждое событие
+    if view == EventView.DETAIL:
+        return EVENTS_ADAPTER.validate_python(events, from_attributes=True)
+
+    cards = EVENT_CARDS_ADAPTER.validate_python(events, from_attributes=True)
+    preview = await EventsService.get_members_preview(
+        session, [card.id for card in cards], limit=settings.EVENTS_MEMBERS_PREVIEW_SIZE
+    )
+    for card in cards:
+        card.members_preview = [UserPreviewResponse.model_validate(member) for member in preview.get(card.id, [])]
+    return cards
+
+
+def json_response(content: bytes, headers: Optional[dict] = None) -> Response:
+    # Тело уже закодировано сериализатором pydantic-core, FastAPI не валидирует его повторно
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+async def stream_events_ndjson(view: EventView, **filters) -> AsyncIterator[str]:
+    # Отдельная сессия: генератор работает уже после выхода из обработчика
+    async with SessionLocal() as session:
+        async for events in EventsService.stream_events(session, batch_size=settings.STREAM_BATCH_SIZE, view=view, **filters):
+            items = await events_to_responses(session, events, view)
+            yield "".join(item.model_dump_json() + "\n" for item in items)
+
+
+def encode_events(items: list[EventResponse] | list[EventCardResponse], view: EventView = EventView.DETAIL) -> bytes:
+    adapter = EVENTS_ADAPTER if view == EventView.DETAIL else EVENT_CARDS_ADAPTER
+    return adapter.dump_json(items)
+
+
+@router.get("/events", response_model=list[EventResponse] | list[EventCardResponse], status_code=status.HTTP_200_OK)
 async def get_events_request(
     session: SessionDependency,
+    request: Request,
     user: User = Depends(user_dependency),
     user_id: Optional[int] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     max_members: Optional[int] = None,
     name: Optional[str] = None,
+    search: Optional[str] = Query(None, description="Full-text search by name and descriptions"),
     type: Optional[List[EventType]] = Query(None, description="List of event types (can specify multiple)"),
     status: Optional[EventStatus] = None,
     city: Optional[List[EventCity]] = Query(None, description="List of cities (can specify multiple)"),
-) -> list[EventResponse]:
+    view: EventView = Query(EventView.DETAIL, description="card - without description and member list, with members preview"),
+    limit: int = Query(
+        settings.EVENTS_LIST_MAX_SIZE, ge=1, le=settings.EVENTS_LIST_MAX_SIZE,
+        description="At most this many events; use /events/page or NDJSON to read everything",
+    ),
+) -> list[EventResponse] | list[EventCardResponse]:
 
     if user_id == -1:
         user_id = user.id
 
+    is_admin = user.role == UserRole.ADMIN
+    filters = dict(
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date,
+        max_members=max_members,
+        name=name,
+        search=search,
+        type=type,
+        status=status,
+        city=city,
+    )
+    if wants_ndjson(request):
+        return StreamingResponse(
+            stream_events_ndjson(view, is_admin=is_admin, current_user_id=user.id, **filters),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    cache_key = events_cache.make_key(events_cache.scope(user.id, is_admin), view=view, limit=limit, **filters)
+    cached = events_cache.get(cache_key)
+    if cached is not None:
+        etag, body = cached
+    else:
+        # Сначала дешёвый отпечаток выборки: если клиент уже видел эту версию, события не загружаем
+        version = await EventsService.get_events_version(
+            session, limit=limit, is_admin=is_admin, current_user_id=user.id, **filters,
+        )
+        etag = make_etag(user.id, view.value, version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        events = await EventsService.get_events(
+            session=session,
+            view=view,
+            limit=limit,
+            is_admin=is_admin,
+            current_user_id=user.id,
+            **filters,
+        )
+        body = encode_events(await events_to_responses(session, events, view), view)
+        # Между отпечатком и загрузкой событие могло измениться - ETag берём по загруженным строкам
+        etag = make_etag(user.id, view.value, EventsService.events_version(events))
+        events_cache.set(cache_key, (etag, body), event_ids=[event.id for event in events])
+
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return json_response(body, headers={"ETag": etag})
+
+
+@router.get("/events/page", response_model=EventsPageResponse, status_code=status.HTTP_200_OK)
+async def get_events_page_request(
+    session: SessionDependency,
+    user: User = Depends(user_dependency),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    max_members: Optional[int] = None,
+    name: Optional[str] = None,
+    search: Optional[str] = Query(None, description="Full-text search by name and descriptions"),
+    type: Optional[List[EventType]] = Query(None, description="List of event types (can specify multiple)"),
+    status: Optional[EventStatus] = None,
+    city: Optional[List[EventCity]] = Query(None, description="List of cities (can specify multiple)"),
+    view: EventView = Query(EventView.DETAIL, description="card - without description and member list, with members preview"),
+) -> EventsPageResponse:
 
-    events = await EventsService.get_events(
+    if user_id == -1:
+        user_id = user.id
+
+    events, next_cursor = await EventsService.get_events_page(
         session=session,
+        limit=limit,
+        cursor=cursor,
+        view=view,
         user_id=user_id,
         start_date=start_date,
         end_date=end_date,
         max_members=max_members,
         name=name,
+        search=search,
         type=type,
         status=status,
         city=city,
         is_admin=user.role == UserRole.ADMIN,
         current_user_id=user.id,
     )
+    page = EventsPageResponse(items=await events_to_responses(session, events, view), next_cursor=next_cursor)
+    return json_response(EVENTS_PAGE_ADAPTER.dump_json(page))
+
 
-    result = []
-    for event in events:
-        is_user_in_event = user.id in [
-            member.id for member in event.members
-        ]
-        is_user_liked_event = user.id in [like.id for like in event.likes]
-        event_response = EventResponse.model_validate(event)
-        result.append(event_response.model_copy(update={
-            'is_user_in_event': is_user_in_event,
-            'is_user_liked_event': is_user_liked_event
-        }))
-    return result
-
-
-@router.get('/events/liked')
+@router.get('/events/liked', response_model=list[EventResponse] | list[EventCardResponse], status_code=status.HTTP_200_OK)
 async def get_likes_request(
     session: SessionDependency,
     user: User = Depends(user_dependency),
-) -> list[EventResponse]:
-    events = await EventsService.get_liked_events(session, user=user, is_admin=user.role == UserRole.ADMIN)
-    result = []
-    for event in events:
-        is_user_in_event = user.id in [member.id for member in event.members]
-        is_user_liked_event = user.id in [like.id for like in event.likes]
-        event_response = EventResponse.model_validate(event)
-        result.append(event_response.model_copy(update={
-            'is_user_liked_event': is_user_liked_event,
-            'is_user_in_event': is_user_in_event
-        }))
-    return result
+    view: EventView = Query(EventView.DETAIL, description="card - without description and member list, with members preview"),
+    limit: int = Query(
+        settings.EVENTS_LIST_MAX_SIZE, ge=1, le=settings.EVENTS_LIST_MAX_SIZE,
+        description="At most this many events; use /events/liked/page to read everything",
+    ),
+) -> list[EventResponse] | list[EventCardResponse]:
+    events = await EventsService.get_liked_events(
+        session, user=user, is_admin=user.role == UserRole.ADMIN, view=view, limit=limit,
+    )
+    return json_response(encode_events(await events_to_responses(session, events, view), view))
+
+
+@router.get('/events/liked/page', response_model=EventsPageResponse, status_code=status.HTTP_200_OK)
+async def get_likes_page_request(
+    session: SessionDependency,
+    user: User = Depends(user_dependency),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    view: EventView = Query(EventView.DETAIL, description="card - without description and member list, with members preview"),
+) -> EventsPageResponse:
+    events, next_cursor = await EventsService.get_liked_events_page(
+        session,
+        user=user,
+        limit=limit,
+        cursor=cursor,
+        is_admin=user.role == UserRole.ADMIN,
+        view=view,
+    )
+    page = EventsPageResponse(items=await events_to_responses(session, events, view), next_cursor=next_cursor)
+    return json_response(EVENTS_PAGE_ADAPTER.dump_json(page))
 
 
 @router.get('/events/{event_id}', response_model=EventResponse, status_code=status.HTTP_200_OK)
 async def get_event_request(
     session: SessionDependency,
     event_id: int,
+    request: Request,
+    response: Response,
     user: User = Depends(user_dependency),
 ) -> EventResponse:
-    event = await EventsService.get_event_by_id(session, event_id)
+    version = await EventsService.get_event_version(session, event_id)
     if user.role != UserRole.ADMIN:
-        invited_user_ids = [invited_user.id for invited_user in event.invited_users]
-        if user.id not in invited_user_ids:
+        if not await EventsService.is_user_invited(session, event_id, user.id):
             from fastapi import HTTPException, status
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You are not invited to this event"
             )
-    
-    event_response = EventResponse.model_validate(event)
-    is_user_in_event = user.id in [member.id for member in event.members]
-    is_user_liked_event = user.id in [like.id for like in event.likes]
-    return event_response.model_copy(update={
-        'is_user_in_event': is_user_in_event,
-        'is_user_liked_event': is_user_liked_event
-    })
+
+    etag = make_etag(user.id, event_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    event = await EventsService.get_event_with_stats(session, event_id, user.id)
+    response.headers["ETag"] = make_etag(user.id, event_id, event.version)
+    return EventResponse.model_validate(event)
 
 
-@router.post("/events/{event_id}/join", response_model=EventResponse, status_code=status.HTTP_200_OK)
+@router.post("/events/{event_id}/join", response_model=EventMembershipResponse, status_code=status.HTTP_200_OK)
 async def join_event_request(
     session: SessionDependency,
     event_id: int,
     user: User = Depends(user_dependency),
-) -> EventResponse:
-    event_obj = await EventsService.join_event(session, event_id, user=user)
-    event_response = EventResponse.model_validate(event_obj)
-
-    event_date = event_obj.start_date.strftime("%d.%m.%Y") if event_obj.start_date else ""
-    event_location = event_obj.location if event_obj.location else ""
-
-    admin_emails = await UsersService.get_admin_emails(session)
-    for email in admin_emails:
-        create_task(EmailService.send_event_member_confirmed_email(
-            email=email,
-            event_name=event_obj.name,
-            event_date=event_date if event_date else "",
-            event_time="",
-            event_location=event_location if event_location else "Не указано",
-            member_name=user.name,
-            new_members_count=len(event_obj.members),
-            event_url=f"{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event_obj.id)}"
-        ))
-
-    return event_response.model_copy(update={
-        'is_user_in_event': True,
-        'is_user_liked_event': user.id in [like.id for like in event_obj.likes]
-    })
+) -> EventMembershipResponse:
+    membership = await EventsService.join_event(session, event_id, user=user)
+    if not membership.joined:
+        # Мест нет: пользователь в очереди
+        position, _ = await EventsService.get_waitlist_state(session, event_id, user.id)
+        return EventMembershipResponse(
+            event_id=membership.id,
+            is_user_in_event=False,
+            members_count=membership.members_count,
+            max_members=membership.max_members,
+            is_user_waitlisted=True,
+            waitlist_position=position,
+        )
+
+    return EventMembershipResponse(
+        event_id=membership.id,
+        is_user_in_event=True,
+        members_count=membership.members_count,
+        max_members=membership.max_members,
+    )
 
 
 @router.get('/events/{event_id}/leave', response_model=EventResponse, status_code=status.HTTP_200_OK)
@@ -150,58 +288,53 @@ async def leave_event_request(
     event_obj = await EventsService.leave_event(session, event_id, user=user)
     event_response = EventResponse.model_validate(event_obj)
 
-    event_date = event_obj.start_date.strftime("%d.%m.%Y") if event_obj.start_date else ""
-    event_location = event_obj.location if event_obj.location else ""
-
-    admin_emails = await UsersService.get_admin_emails(session)
-    for email in admin_emails:
-        create_task(EmailService.send_event_member_cancelled_email(
-            email=email,
-            event_name=event_obj.name,
-            event_date=event_date if event_date else "",
-            event_time="",
-            event_location=event_location if event_location else "Не указано",
-            member_name=user.name,
-            new_members_count=len(event_obj.members),
-            event_url=f"{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event_obj.id)}"
-        ))
-
-    is_user_liked_event = user.id in [like.id for like in event_obj.likes]
-    return event_response.model_copy(update={
-        'is_user_in_event': False,
-        'is_user_liked_event': is_user_liked_event
-    })
-
-
-@router.post("/events/{event_id}/like", response_model=EventResponse, status_code=status.HTTP_200_OK)
-async def like_event_request(
+    return event_response
+
+
+@router.get('/events/{event_id}/waitlist', response_model=EventWaitlistResponse, status_code=status.HTTP_200_OK)
+async def get_event_waitlist_request(
     session: SessionDependency,
     event_id: int,
     user: User = Depends(user_dependency),
-) -> EventResponse:
+) -> EventWaitlistResponse:
+    position, size = await EventsService.get_waitlist_state(session, event_id, user.id)
+    return EventWaitlistResponse(
+        event_id=event_id,
+        is_user_waitlisted=position is not None,
+        waitlist_position=position,
+        waitlist_size=size,
+    )
 
-    event_obj = await EventsService.like_event(session, event_id, user=user)
-    event_response = EventResponse.model_validate(event_obj)
-    is_user_in_event = user.id in [member.id for member in event_obj.members]
-    return event_response.model_copy(update={
-        'is_user_in_event': is_user_in_event,
-        'is_user_liked_event': True
-    })
 
+@router.delete('/events/{event_id}/waitlist', response_model=EventWaitlistResponse, status_code=status.HTTP_200_OK)
+async def leave_event_waitlist_request(
+    session: SessionDependency,
+    event_id: int,
+    user: User = Depends(user_dependency),
+) -> EventWaitlistResponse:
+    await EventsService.leave_waitlist(session, event_id, user=user)
+    _, size = await EventsService.get_waitlist_state(session, event_id, user.id)
+    return EventWaitlistResponse(event_id=event_id, is_user_waitlisted=False, waitlist_size=size)
 
-@router.delete("/events/{event_id}/unlike", response_model=EventResponse, status_code=status.HTTP_200_OK)
+
+@router.post("/events/{event_id}/like", response_model=EventLikeResponse, status_code=status.HTTP_200_OK)
+async def like_event_request(
+    session: SessionDependency,
+    event_id: int,
+    user: User = Depends(user_dependency),
+) -> EventLikeResponse:
+    likes_count = await EventsService.like_event(session, event_id, user=user)
+    return EventLikeResponse(liked=True, likes_count=likes_count)
+
+
+@router.delete("/events/{event_id}/unlike", response_model=EventLikeResponse, status_code=status.HTTP_200_OK)
 async def unlike_event_request(
     session: SessionDependency,
     event_id: int,
     user: User = Depends(user_dependency),
-) -> EventResponse:
-    event_obj = await EventsService.unlike_event(session, event_id, user=user)
-    event_response = EventResponse.model_validate(event_obj)
-    is_user_in_event = user.id in [member.id for member in event_obj.members]
-    return event_response.model_copy(update={
-        'is_user_in_event': is_user_in_event,
-        'is_user_liked_event': False
-    })
+) -> EventLikeResponse:
+    likes_count = await EventsService.unlike_event(session, event_id, user=user)
+    return EventLikeResponse(liked=False, likes_count=likes_count)
 
 
 @router.post("/events/{event_id}/comment", response_model=EventResponse, status_code=status.HTTP_200_OK)
@@ -212,11 +345,7 @@ async def comment_event_request(
     user: User = Depends(user_dependency),
 ) -> EventResponse:
     event_obj = await EventsService.comment_event(session, event_id, user=user, comment=comment)
-    event_response = EventResponse.model_validate(event_obj)
-    return event_response.model_copy(update={
-        'is_user_in_event': user.id in [member.id for member in event_obj.members],
-        'is_user_liked_event': user.id in [like.id for like in event_obj.likes]
-    })
+    return EventResponse.model_validate(event_obj)
 
 
 @router.get('/events/{event_id}/comments', response_model=List[EventCommentAdminResponse], status_code=status.HTTP_200_OK)
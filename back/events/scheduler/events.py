@@ -1,77 +1,84 @@
 import logging
-from asyncio import gather
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from events.enums.events import EventStatus
+from events.services.cache import events_cache
 from events.services.events import EventsService
 from main.config.settings import settings
-from main.db.db import SessionLocal
+from main.db.db import SessionLocal, try_advisory_xact_lock
 from notifications.enums.notifications import NotificationType
-from notifications.services.email import EmailService
+from notifications.enums.outbox import EmailKind
 from notifications.services.notifications import NotificationsService
+from notifications.services.outbox import OutboxService
 
 scheduler = AsyncIOScheduler()
 
 logger = logging.getLogger(__name__)
 
 
+def event_email_payload(event) -> dict:
+    return {
+        "event_name": event.name,
+        "event_date": event.start_date.strftime("%d.%m.%Y") if event.start_date else "",
+        "event_time": "",
+        "event_location": event.location if event.location else "Не указано",
+        "event_url": f'{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event.id)}',
+    }
+
+
 @scheduler.scheduled_job('cron', hour=0, minute=0)
 async def update_events():
     async with SessionLocal() as session:
+        if not await try_advisory_xact_lock(session, "update_events"):
+            logger.info("Events update is already running in another process")
+            return
         logger.info("Updating events states and sending notifications to users")
-        events = await EventsService.get_events(session=session)
         now = datetime.now().date()
 
-        tasks = []
-
-        for event in events:
-            if (event.start_date and event.start_date > now and
-                    (event.start_date - now).days <= 1 and
-                    event.status != EventStatus.COMPLETED and
-                    event.status != EventStatus.CANCELLED):
-                for member in event.members:
-                    tasks.append(EmailService.send_event_reminder_24h_email(
-                        email=member.email,
-                        event_name=event.name,
-                        event_date=event.start_date.strftime("%d.%m.%Y") if event.start_date else "",
-                        event_time="",
-                        event_location=event.location if event.location else "Не указано",
-                        members_count=len(event.members),
-                        event_url=f'{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event.id)}'
-                    ))
-                    tasks.append(NotificationsService.create_notification(
-                        session=session,
-                        user_id=member.id,
-                        event_id=event.id,
-                        type=NotificationType.EVENT_REMINDER_24H
-                    ))
+        # Статусы меняются UPDATE ... WHERE в базе, рассылки идут только по изменившимся
+        # событиям: работа пропорциональна числу переходов, а не размеру таблицы
+        changed = await EventsService.advance_statuses(session, now)
+        reminders = await EventsService.get_events_starting_on(session, now + timedelta(days=1))
+        completed = changed[EventStatus.COMPLETED]
 
-            if event.end_date and event.end_date <= now:
-                event.status = EventStatus.COMPLETED
-                for member in event.members:
-                    tasks.append(EmailService.send_event_review_email(
-                        email=member.email,
-                        event_name=event.name,
-                        event_date=event.start_date.strftime("%d.%m.%Y") if event.start_date else "",
-                        event_time="",
-                        event_location=event.location if event.location else "Не указано",
-                        event_url=f'{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event.id)}'
-                    ))
-                    tasks.append(NotificationsService.create_notification(
-                        session=session,
-                        user_id=member.id,
-                        event_id=event.id,
-                        type=NotificationType.EVENT_REVIEW
-                    ))
-            elif event.start_date and event.end_date and event.start_date <= now < event.end_date:
-                event.status = EventStatus.ACTIVE
-            elif event.start_date and event.start_date > now:
-                if event.status != EventStatus.COMING_SOON:
-                    event.status = EventStatus.COMING_SOON
+        for event in reminders:
+            await OutboxService.enqueue_for_members(
+                session, event.id, EmailKind.EVENT_REMINDER_24H,
+                members_count=event.members_count,
+                **event_email_payload(event)
+            )
+        for event in completed:
+            await OutboxService.enqueue_for_members(
+                session, event.id, EmailKind.EVENT_REVIEW,
+                **event_email_payload(event)
+            )
 
-        if tasks:
-            await gather(*tasks)
+        await NotificationsService.create_notifications_for_members(
+            session, [event.id for event in reminders], NotificationType.EVENT_REMINDER_24H
+        )
+        await NotificationsService.create_notifications_for_members(
+            session, [event.id for event in completed], NotificationType.EVENT_REVIEW
+        )
 
+        # Статусы, уведомления и письма фиксируются вместе; письма доставит воркер outbox
         await session.commit()
+        logger.info(
+            f"Events moved: {', '.join(f'{status.name}={len(rows)}' for status, rows in changed.items())}, "
+            f"reminders for {len(reminders)} events"
+        )
+        # Смена статуса меняет выборки с фильтром по статусу, поэтому кэш сбрасывается целиком,
+        # но только если что-то действительно изменилось
+        if any(changed.values()):
+            events_cache.clear()
+
+
+@scheduler.scheduled_job('cron', minute=30)
+async def reconcile_event_counters():
+    async with SessionLocal() as session:
+        if not await try_advisory_xact_lock(session, "reconcile_event_counters"):
+            return
+        event_ids = await EventsService.reconcile_counters(session)
+        if event_ids:
+            logger.warning(f"Repaired members/likes counters for {len(event_ids)} events: {event_ids[:20]}")
@@ -3,7 +3,7 @@ from datetime import date
 from pydantic import BaseModel, ConfigDict
 
 from events.enums.events import EventCity, EventStatus, EventType
-from users.schemas.responses import UserResponse
+from users.schemas.responses import UserPreviewResponse, UserResponse
 
 
 class EventResponse(BaseModel):
@@ -23,5 +23,54 @@ class EventResponse(BaseModel):
     city: EventCity
     type: EventType
     members: list[UserResponse]
+    members_count: int = 0
+    likes_count: int = 0
     is_user_in_event: bool = False
     is_user_liked_event: bool = False
+
+
+class EventCardResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    image_url: str
+    start_date: date | None
+    end_date: date
+    short_description: str | None
+    location: str | None
+    max_members: int | None
+    status: EventStatus
+    city: EventCity
+    type: EventType
+    members_preview: list[UserPreviewResponse] = []
+    members_count: int = 0
+    likes_count: int = 0
+    is_user_in_event: bool = False
+    is_user_liked_event: bool = False
+
+
+class EventMembershipResponse(BaseModel):
+    event_id: int
+    is_user_in_event: bool
+    members_count: int
+    max_members: int | None
+    is_user_waitlisted: bool = False
+    waitlist_position: int | None = None
+
+
+class EventLikeResponse(BaseModel):
+    liked: bool
+    likes_count: int
+
+
+class EventWaitlistResponse(BaseModel):
+    event_id: int
+    is_user_waitlisted: bool
+    waitlist_position: int | None = None
+    waitlist_size: int
+
+
+class EventsPageResponse(BaseModel):
+    items: list[EventResponse] | list[EventCardResponse]
+    next_cursor: str | None = None
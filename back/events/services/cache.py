@@ -0,0 +1,244 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date
+from enum import Enum
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+import asyncpg
+
+from main.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ADMIN_SCOPE = "admin"
+
+
+class EventsCache:
+    """LRU/TTL-кэш ответов списка событий внутри процесса.
+
+    Каждая запись помнит, какие события в неё попали и для какой области видимости
+    (пользователь или админ) она собрана, чтобы изменения инвалидировали только
+    затронутые записи. Инвалидации передаются в publish (EventsCacheSync рассылает их
+    остальным процессам), а чужие применяются через apply.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any, frozenset[int], Hashable]] = OrderedDict()
+        self._keys_by_event: dict[int, set[Hashable]] = {}
+        self._keys_by_scope: dict[Hashable, set[Hashable]] = {}
+        self.publish: Optional[Callable[[dict], None]] = None
+
+    @staticmethod
+    def scope(user_id: int, is_admin: bool) -> Hashable:
+        # Админ видит все события, обычный пользователь - только те, куда приглашён.
+        # Флаги is_user_in_event/is_user_liked_event персональны, поэтому id входит в ключ всегда
+        return (ADMIN_SCOPE, user_id) if is_admin else user_id
+
+    @staticmethod
+    def make_key(scope: Hashable, **filters) -> Hashable:
+        def normalize(value):
+            if isinstance(value, Enum):
+                return value.value
+            if isinstance(value, date):
+                return value.isoformat()
+            if isinstance(value, (list, tuple, set)):
+                return tuple(sorted(normalize(item) for item in value)) or None
+            if isinstance(value, str):
+                return value.strip() or None
+            return value
+
+        normalized = tuple(sorted((name, normalize(value)) for name, value in filters.items()))
+        return scope, tuple(item for item in normalized if item[1] is not None)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value, _, _ = entry
+        if expires_at < time.monotonic():
+            self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, event_ids: Iterable[int]) -> None:
+        if self.max_size <= 0:
+            return
+        if key in self._entries:
+            self._drop(key)
+        event_ids = frozenset(event_ids)
+        scope = key[0]
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value, event_ids, scope)
+        for event_id in event_ids:
+            self._keys_by_event.setdefault(event_id, set()).add(key)
+        self._keys_by_scope.setdefault(scope, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            oldest_key = next(iter(self._entries))
+            self._drop(oldest_key)
+            self.evictions += 1
+
+    def invalidate_events(self, event_ids: Iterable[int]) -> None:
+        self._invalidate({"events": list(event_ids)})
+
+    def invalidate_users(self, user_ids: Iterable[int], include_admins: bool = False) -> None:
+        self._invalidate({"users": list(user_ids), "admins": include_admins})
+
+    def clear(self) -> None:
+        self._invalidate({"clear": True})
+
+    def _invalidate(self, message: dict) -> None:
+        self.apply(message)
+        if self.publish is not None:
+            self.publish(message)
+
+    def apply(self, message: dict) -> None:
+        # Применяет инвалидацию локально, не рассылая её дальше
+        if message.get("clear"):
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._keys_by_event.clear()
+            self._keys_by_scope.clear()
+            return
+
+        for event_id in message.get("events", ()):
+            for key in list(self._keys_by_event.get(event_id, ())):
+                self._drop(key)
+                self.invalidations += 1
+
+        scopes = set(message.get("users", ()))
+        if message.get("admins"):
+            scopes.update(scope for scope in self._keys_by_scope if isinstance(scope, tuple) and scope[0] == ADMIN_SCOPE)
+        for scope in scopes:
+            for key in list(self._keys_by_scope.get(scope, ())):
+                self._drop(key)
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        _, _, event_ids, scope = entry
+        for event_id in event_ids:
+            keys = self._keys_by_event.get(event_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_event[event_id]
+        keys = self._keys_by_scope.get(scope)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_scope[scope]
+
+
+class EventsCacheSync:
+    """Общая инвалидация events_cache для нескольких процессов API через Postgres LISTEN/NOTIFY.
+
+    Каждый процесс держит одно соединение: слушает канал и через него же публикует свои
+    инвалидации (своё сообщение узнаёт по origin и пропускает). Сообщения уходят после
+    коммита записи, поэтому остальные процессы отстают на миллисекунды; при обрыве
+    соединения кэш процесса очищается целиком - пропущенные сообщения не восстановить.
+    TTL кэша остаётся страховкой на случай потерянного сообщения.
+    """
+
+    CHANNEL = "events_cache"
+    # Предел payload у NOTIFY - 8000 байт; длинный список id заменяется полной очисткой
+    MAX_PAYLOAD = 7900
+
+    def __init__(self, cache: EventsCache, dsn: str, retry_seconds: float = 5):
+        self.cache = cache
+        self.dsn = dsn
+        self.retry_seconds = retry_seconds
+        self.origin = uuid.uuid4().hex
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self.cache.publish = self._queue.put_nowait
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, drain_seconds: float = 1) -> None:
+        self.cache.publish = None
+        # Даём отправить накопленные инвалидации, пока соединение живо
+        deadline = time.monotonic() + drain_seconds
+        while self._queue is not None and not self._queue.empty() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _encode(self, message: dict) -> str:
+        payload = json.dumps({"origin": self.origin, **message})
+        if len(payload) > self.MAX_PAYLOAD:
+            payload = json.dumps({"origin": self.origin, "clear": True})
+        return payload
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Malformed events cache message: {payload[:200]!r}")
+            return
+        if message.pop("origin", None) != self.origin:
+            self.cache.apply(message)
+
+    async def _run(self) -> None:
+        pending: Optional[str] = None
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(self.CHANNEL, self._on_notify)
+                # Пока процесс не слушал канал, чужие инвалидации могли пройти мимо
+                self.cache.apply({"clear": True})
+                while True:
+                    if pending is None:
+                        pending = self._encode(await self._queue.get())
+                    await connection.execute("SELECT pg_notify($1, $2)", self.CHANNEL, pending)
+                    pending = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Events cache sync connection failed: {e}, retrying in {self.retry_seconds}s")
+                await asyncio.sleep(self.retry_seconds)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+
+
+events_cache = EventsCache(max_size=settings.EVENTS_CACHE_MAX_SIZE, ttl_seconds=settings.EVENTS_CACHE_TTL_SECONDS)
+events_cache_sync = EventsCacheSync(
+    events_cache,
+    dsn=settings.DATABASE_URL.replace("+asyncpg", "", 1),
+    retry_seconds=settings.EVENTS_CACHE_SYNC_RETRY_SECONDS,
+)
@@ -1,36 +1,239 @@
+import base64
 import csv
+import hashlib
+import json
 from datetime import date, datetime, timezone
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, status
 from openpyxl import Workbook
-from sqlalchemy import select
+from sqlalchemy import BigInteger, Row, Select, and_, any_, bindparam, case, delete, exists, false, func, literal, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, raiseload, selectinload, with_expression
 
-from events.enums.events import EventCity, EventStatus, EventType
-from events.models.events import Event, EventComments, EventInvitedUsers, EventMembers
+from events.enums.events import EventCity, EventStatus, EventType, EventView
+from events.models.events import Event, EventComments, EventInvitedUsers, EventLikes, EventMembers, EventWaitlist
 from events.schemas.requests import EventCommentRequest, EventRequest, EventUpdateRequest
+from events.services.cache import events_cache
 from main.config.settings import settings
+from notifications.enums.notifications import NotificationType
+from notifications.enums.outbox import EmailKind
+from notifications.models.notifications import Notification
+from notifications.services.notifications import NotificationsService
+from notifications.services.outbox import OutboxService
 from users.models.user import User
 
 
 class EventsService:
+    @staticmethod
+    def with_stats(query: Select, user_id: Optional[int] = None) -> Select:
+        # Счётчики хранятся в самом событии, флаги текущего пользователя считаются
+        # в SQL коррелированными EXISTS по PK (event_id, user_id), без загрузки списков User
+        if user_id is not None:
+            is_user_in_event = exists().where(EventMembers.event_id == Event.id, EventMembers.user_id == user_id)
+            is_user_liked_event = exists().where(EventLikes.event_id == Event.id, EventLikes.user_id == user_id)
+        else:
+            is_user_in_event = is_user_liked_event = false()
+
+        return query.options(
+            with_expression(Event.is_user_in_event, is_user_in_event),
+            with_expression(Event.is_user_liked_event, is_user_liked_event),
+        ).execution_options(populate_existing=True)
+
+    @staticmethod
+    def with_view(query: Select, view: EventView = EventView.DETAIL) -> Select:
+        if view == EventView.CARD:
+            # Карточка не читает описание и оплату и никогда не грузит участников:
+            # превью берётся отдельным запросом get_members_preview
+            return query.options(
+                load_only(
+                    Event.id, Event.name, Event.image_url, Event.start_date, Event.end_date,
+                    Event.short_description, Event.location, Event.max_members,
+                    Event.status, Event.city, Event.type, Event.members_count, Event.likes_count,
+                    Event.version,
+                ),
+                raiseload(Event.members),
+            )
+        return query.options(selectinload(Event.members))
+
+    @staticmethod
+    async def get_members_preview(session: AsyncSession, event_ids: List[int], limit: int) -> dict[int, List[User]]:
+        if not event_ids:
+            return {}
+        position = (
+            func.row_number()
+            .over(partition_by=EventMembers.event_id, order_by=EventMembers.user_id)
+            .label("position")
+        )
+        ranked = (
+            select(EventMembers.event_id, EventMembers.user_id, position)
+            .where(EventMembers.event_id.in_(event_ids))
+            .subquery()
+        )
+        result = await session.execute(
+            select(ranked.c.event_id, User)
+            .join(User, User.id == ranked.c.user_id)
+            .where(ranked.c.position <= limit)
+            .order_by(ranked.c.event_id, ranked.c.position)
+        )
+        preview: dict[int, List[User]] = {}
+        for event_id, user in result.all():
+            preview.setdefault(event_id, []).append(user)
+        return preview
+
+    @staticmethod
+    def encode_cursor(key: list) -> str:
+        payload = json.dumps(key)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str, by_rank: bool = False) -> Tuple[date | float, int]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            position, event_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if by_rank:
+                if isinstance(position, bool) or not isinstance(position, (int, float)):
+                    raise ValueError("rank cursor expected")
+                return float(position), int(event_id)
+            return date.fromisoformat(position), int(event_id)
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    @staticmethod
+    def search_rank(search: str):
+        # Релевантность поиска: ранг полнотекстового совпадения + триграммное сходство названия
+        ts_query = func.websearch_to_tsquery('russian', search)
+        return func.ts_rank_cd(Event.search_vector, ts_query) + func.similarity(Event.name, search)
+
+    @staticmethod
+    async def paginate_events(
+        session: AsyncSession,
+        query: Select,
+        limit: int,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> Tuple[List[Event], Optional[str]]:
+        # Keyset-пагинация по (start_date, id): страница использует idx_event_start_date_id
+        # и не зависит от того, насколько далеко клиент пролистал список.
+        # С поиском порядок - по релевантности, как у /events: ключ (rank desc, id), ранг
+        # возвращается вместе со строкой и попадает в курсор
+        if search:
+            rank = EventsService.search_rank(search)
+            if cursor is not None:
+                last_rank, last_id = EventsService.decode_cursor(cursor, by_rank=True)
+                query = query.where(or_(rank < last_rank, and_(rank == last_rank, Event.id > last_id)))
+            query = query.order_by(None).order_by(rank.desc(), Event.id).add_columns(rank).limit(limit + 1)
+            rows = (await session.execute(query)).all()
+            if len(rows) <= limit:
+                return [row[0] for row in rows], None
+            rows = rows[:limit]
+            return [row[0] for row in rows], EventsService.encode_cursor([rows[-1][1], rows[-1][0].id])
+
+        if cursor is not None:
+            query = query.where(tuple_(Event.start_date, Event.id) > EventsService.decode_cursor(cursor))
+        query = query.order_by(None).order_by(Event.start_date, Event.id).limit(limit + 1)
+
+        result = await session.execute(query)
+        events = list(result.scalars().all())
+        if len(events) <= limit:
+            return events, None
+        events = events[:limit]
+        return events, EventsService.encode_cursor([events[-1].start_date.isoformat(), events[-1].id])
+
     @staticmethod
     async def get_events(
         session: AsyncSession,
+        view: EventView = EventView.DETAIL,
+        limit: Optional[int] = None,
+        **filters,
+    ) -> List[Event]:
+        query = EventsService.limit_events(EventsService.build_events_query(**filters), limit, filters.get("search"))
+        query = EventsService.with_view(query, view)
+        query = EventsService.with_stats(query, filters.get("current_user_id"))
+        result = await session.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    async def stream_events(
+        session: AsyncSession,
+        batch_size: int,
+        view: EventView = EventView.DETAIL,
+        **filters,
+    ) -> AsyncIterator[List[Event]]:
+        # Серверный курсор: в памяти одновременно не больше batch_size событий
+        query = EventsService.with_view(EventsService.build_events_query(**filters), view)
+        query = EventsService.with_stats(query, filters.get("current_user_id"))
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for events in result.scalars().partitions():
+            yield events
+
+    @staticmethod
+    async def get_events_page(
+        session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        view: EventView = EventView.DETAIL,
+        **filters,
+    ) -> Tuple[List[Event], Optional[str]]:
+        query = EventsService.with_view(EventsService.build_events_query(**filters), view)
+        query = EventsService.with_stats(query, filters.get("current_user_id"))
+        return await EventsService.paginate_events(
+            session, query, limit=limit, cursor=cursor, search=filters.get("search"),
+        )
+
+    @staticmethod
+    async def get_events_version(session: AsyncSession, limit: Optional[int] = None, **filters) -> str:
+        # Отпечаток выборки одной строкой: id и version всех подходящих событий,
+        # без загрузки ORM-объектов. version растёт при любом изменении события,
+        # его участников и лайков. С limit - только по событиям, попавшим в ответ
+        events = (
+            EventsService.limit_events(EventsService.build_events_query(**filters), limit, filters.get("search"))
+            .with_only_columns(Event.id, Event.version)
+            .subquery()
+        )
+        version = func.concat(events.c.id, ':', events.c.version)
+        query = select(func.md5(func.string_agg(version, aggregate_order_by(literal(','), events.c.id))))
+        result = await session.execute(query)
+        return result.scalar() or ""
+
+    @staticmethod
+    def events_version(events: List[Event]) -> str:
+        # Тот же отпечаток, что get_events_version, но по уже загруженным событиям:
+        # ETag ответа должен описывать именно тот снимок, из которого собрано тело
+        if not events:
+            return ""
+        version = ",".join(f"{event.id}:{event.version}" for event in sorted(events, key=lambda event: event.id))
+        return hashlib.md5(version.encode()).hexdigest()
+
+    @staticmethod
+    def limit_events(query: Select, limit: Optional[int], search: Optional[str] = None) -> Select:
+        # Тот же порядок, что у постраничной выдачи: при поиске build_events_query уже
+        # сортирует по релевантности, иначе - по дате начала
+        if limit is None:
+            return query
+        if not search:
+            query = query.order_by(None).order_by(Event.start_date, Event.id)
+        return query.limit(limit)
+
+    @staticmethod
+    def build_events_query(
         user_id: Optional[int] = None,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         max_members: Optional[int] = None,
         name: Optional[str] = None,
+        search: Optional[str] = None,
         type: Optional[List[EventType]] = None,
         status: Optional[EventStatus] = None,
         city: Optional[List[EventCity]] = None,
         is_admin: bool = False,
         current_user_id: Optional[int] = None,
-    ):
-        query = select(Event).options(selectinload(Event.members), selectinload(Event.likes), selectinload(Event.invited_users))
+    ) -> Select:
+        query = select(Event)
 
         # Если указан user_id, фильтруем по участникам
         if user_id is not None:
@@ -48,9 +251,16 @@ class EventsService:
         if max_members is not None:
             conditions.append(Event.max_members == max_members)
 
-        # TODO: search by name in Event.name
         if name is not None:
             conditions.append(Event.name == name)
+        if search:
+            # Полнотекстовый поиск (GIN по search_vector) + триграммы по названию для опечаток
+            ts_query = func.websearch_to_tsquery('russian', search)
+            conditions.append(or_(
+                Event.search_vector.op('@@')(ts_query),
+                Event.name.op('%')(search),
+            ))
+            query = query.order_by(EventsService.search_rank(search).desc(), Event.id)
         if type is not None:
             if len(type) > 0:
                 conditions.append(Event.type.in_(type))
@@ -66,17 +276,15 @@ class EventsService:
         if conditions:
             query = query.where(*conditions)
 
-        if user_id is not None or (not is_admin and current_user_id is not None):
-            query = query.distinct()
-
-        result = await session.execute(query)
-        return result.scalars().all()
+        return query
 
     @staticmethod
     async def get_event_by_id(session: AsyncSession, event_id: int):
+        # Только строка события: участники, лайки и приглашённые не грузятся, проверки по ним -
+        # отдельные EXISTS/COUNT, чтобы стоимость не росла с размером события
         result = await session.execute(
             select(Event)
-            .options(selectinload(Event.members), selectinload(Event.likes), selectinload(Event.invited_users))
+            .options(raiseload(Event.members), raiseload(Event.likes), raiseload(Event.invited_users))
             .where(Event.id == event_id)
         )
         event = result.scalar_one_or_none()
@@ -88,29 +296,157 @@ class EventsService:
         return event
 
     @staticmethod
-    async def create_event(session: AsyncSession, event: EventRequest, image_path: str, status: EventStatus = EventStatus.COMING_SOON):
-        if event.invited_users:
-            from users.services.users import UsersService
-            invalid_user_ids = []
-            for user_id in event.invited_users:
-                try:
-                    await UsersService.get_user_by_id(session, user_id)
-                except HTTPException:
-                    invalid_user_ids.append(user_id)
-            
-            if invalid_user_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Users with IDs {invalid_user_ids} not found"
-                )
-        
+    async def get_event_with_stats(session: AsyncSession, event_id: int, user_id: Optional[int] = None) -> Event:
+        query = select(Event).options(selectinload(Event.members)).where(Event.id == event_id)
+        result = await session.execute(EventsService.with_stats(query, user_id))
+        event = result.scalar_one_or_none()
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
+            )
+        return event
+
+    @staticmethod
+    async def get_event_version(session: AsyncSession, event_id: int) -> int:
+        result = await session.execute(select(Event.version).where(Event.id == event_id))
+        version = result.scalar_one_or_none()
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
+            )
+        return version
+
+    @staticmethod
+    async def advance_statuses(session: AsyncSession, today: date) -> Dict[EventStatus, List[Row]]:
+        # Ночная смена статусов по датам: по одному UPDATE ... WHERE на целевой статус, меняются
+        # только строки, чей статус расходится с датами. Отменённые и завершённые не трогаются.
+        # Возвращает изменённые события (поля для писем) по новому статусу; коммит - за вызывающим
+        open_event = Event.status.notin_([EventStatus.COMPLETED, EventStatus.CANCELLED])
+        transitions = (
+            (EventStatus.COMPLETED, Event.end_date <= today),
+            (EventStatus.ACTIVE, and_(Event.start_date <= today, Event.end_date > today)),
+            (EventStatus.COMING_SOON, Event.start_date > today),
+        )
+        changed = {}
+        for new_status, condition in transitions:
+            result = await session.execute(
+                update(Event)
+                .where(open_event, condition, Event.status != new_status)
+                .values(status=new_status, version=Event.version + 1)
+                .returning(Event.id, Event.name, Event.start_date, Event.location, Event.members_count)
+                .execution_options(synchronize_session=False)
+            )
+            changed[new_status] = result.all()
+        return changed
+
+    @staticmethod
+    async def get_events_starting_on(session: AsyncSession, day: date) -> List[Row]:
+        # Незавершённые и неотменённые события с началом в day (частичный индекс по start_date)
+        result = await session.execute(
+            select(Event.id, Event.name, Event.start_date, Event.location, Event.members_count)
+            .where(
+                Event.start_date == day,
+                Event.status.notin_([EventStatus.COMPLETED, EventStatus.CANCELLED]),
+            )
+            .order_by(Event.id)
+        )
+        return result.all()
+
+    @staticmethod
+    async def reconcile_counters(session: AsyncSession) -> List[int]:
+        # Пересчитывает members_count/likes_count по связующим таблицам и правит только
+        # разошедшиеся события; возвращает их id.
+        # Сначала кандидаты с расхождением блокируются FOR UPDATE, потом пересчитываются
+        # отдельным запросом: в READ COMMITTED у него свежий снимок, а join/leave/like этих событий
+        # ждут блокировку. В одном UPDATE ... FROM агрегат по старому снимку перезаписал бы
+        # счётчик, который параллельный join уже увеличил
+        members = (
+            select(EventMembers.event_id, func.count().label("count"))
+            .group_by(EventMembers.event_id)
+            .subquery()
+        )
+        likes = (
+            select(EventLikes.event_id, func.count().label("count"))
+            .group_by(EventLikes.event_id)
+            .subquery()
+        )
+        candidates = await session.execute(
+            select(Event.id)
+            .outerjoin(members, members.c.event_id == Event.id)
+            .outerjoin(likes, likes.c.event_id == Event.id)
+            .where(or_(
+                Event.members_count != func.coalesce(members.c.count, 0),
+                Event.likes_count != func.coalesce(likes.c.count, 0),
+            ))
+            .order_by(Event.id)
+            .with_for_update(of=Event)
+        )
+        candidate_ids = list(candidates.scalars().all())
+        if not candidate_ids:
+            await session.commit()
+            return []
+
+        members_count = (
+            select(func.count()).select_from(EventMembers).where(EventMembers.event_id == Event.id).scalar_subquery()
+        )
+        likes_count = (
+            select(func.count()).select_from(EventLikes).where(EventLikes.event_id == Event.id).scalar_subquery()
+        )
+        result = await session.execute(
+            update(Event)
+            .where(
+                Event.id == any_(bindparam("event_ids", candidate_ids, type_=ARRAY(BigInteger))),
+                or_(Event.members_count != members_count, Event.likes_count != likes_count),
+            )
+            .values(members_count=members_count, likes_count=likes_count, version=Event.version + 1)
+            .returning(Event.id)
+            .execution_options(synchronize_session=False)
+        )
+        event_ids = result.scalars().all()
+        await session.commit()
+        events_cache.invalidate_events(event_ids)
+        return event_ids
+
+    @staticmethod
+    async def is_user_invited(session: AsyncSession, event_id: int, user_id: int) -> bool:
+        result = await session.execute(
+            select(exists().where(EventInvitedUsers.event_id == event_id, EventInvitedUsers.user_id == user_id))
+        )
+        return result.scalar()
+
+    @staticmethod
+    async def is_user_member(session: AsyncSession, event_id: int, user_id: int) -> bool:
+        result = await session.execute(
+            select(exists().where(EventMembers.event_id == event_id, EventMembers.user_id == user_id))
+        )
+        return result.scalar()
+
+    @staticmethod
+    async def get_invited_user_ids(session: AsyncSession, event_id: int) -> List[int]:
+        result = await session.execute(
+            select(EventInvitedUsers.user_id).where(EventInvitedUsers.event_id == event_id)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    def invalidate_cache(event_id: int, user_id: int) -> None:
+        # Участие и лайки меняют счётчики события во всех выборках, где оно есть,
+        # и личные выборки самого пользователя (user_id=-1)
+        events_cache.invalidate_events([event_id])
+        events_cache.invalidate_users([user_id])
+
+    @staticmethod
+    async def create_event(session: AsyncSession, event: EventRequest, image_path: str):
+        # Статус определяется датой начала
         start_date = event.start_date
 
         now = datetime.now(timezone.utc).date()
         if start_date <= now:
-            status = EventStatus.ACTIVE
+            event_status = EventStatus.ACTIVE
         else:
-            status = EventStatus.COMING_SOON
+            event_status = EventStatus.COMING_SOON
 
         event_obj = Event(
             name=event.name,
@@ -124,118 +460,341 @@ class EventsService:
             location=event.location,
             city=event.city,
             type=event.type,
-            status=status,
+            status=event_status,
         )
-
         session.add(event_obj)
+        await session.flush()
+
+        invited_user_ids = list(dict.fromkeys(event.invited_users or []))
+        if invited_user_ids:
+            # Проверка и вставка приглашений одним INSERT ... SELECT: строки получают только
+            # существующие пользователи, недостающие id видны по RETURNING
+            result = await session.execute(
+                insert(EventInvitedUsers)
+                .from_select(
+                    ["event_id", "user_id"],
+                    select(literal(event_obj.id), User.id).where(
+                        User.id == any_(bindparam("user_ids", invited_user_ids, type_=ARRAY(BigInteger)))
+                    ),
+                )
+                .returning(EventInvitedUsers.user_id)
+            )
+            found_ids = set(result.scalars().all())
+            invalid_user_ids = [user_id for user_id in invited_user_ids if user_id not in found_ids]
+            if invalid_user_ids:
+                await session.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Users with IDs {invalid_user_ids} not found"
+                )
+
+            # Письма и уведомления о создании фиксируются одной транзакцией с событием
+            await OutboxService.enqueue_for_users(
+                session, invited_user_ids, EmailKind.EVENT_CREATED,
+                event_name=event.name,
+                event_date=event.start_date.strftime("%d.%m.%Y"),
+                event_time="",
+                event_location=event.location if event.location else "Не указано",
+                max_participants=event.max_members if event.max_members else "Не указано",
+                event_description=event.description if event.description else "Не указано",
+                event_url=f"{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event_obj.id)}"
+            )
+            await NotificationsService.create_notifications_bulk(
+                session=session,
+                user_ids=invited_user_ids,
+                event_id=event_obj.id,
+                type=NotificationType.EVENT_CREATED
+            )
+
         await session.commit()
-        await session.refresh(event_obj)
 
-        if event.invited_users:
-            for user_id in event.invited_users:
-                invited_user = EventInvitedUsers(
-                    event_id=event_obj.id,
-                    user_id=user_id
-                )
-                session.add(invited_user)
-            await session.commit()
+        events_cache.invalidate_users(invited_user_ids, include_admins=True)
+        return await EventsService.get_event_with_stats(session, event_obj.id)
 
-        result = await session.execute(
-            select(Event)
-            .options(selectinload(Event.members), selectinload(Event.likes), selectinload(Event.invited_users))
-            .where(Event.id == event_obj.id)
-        )
-        return result.scalar_one()
+    @staticmethod
+    def member_email_payload(event, member_name: str, members_count: int) -> dict:
+        # Аргументы писем админам о вступлении и выходе участника
+        return {
+            "event_name": event.name,
+            "event_date": event.start_date.strftime("%d.%m.%Y") if event.start_date else "",
+            "event_time": "",
+            "event_location": event.location if event.location else "Не указано",
+            "member_name": member_name,
+            "new_members_count": members_count,
+            "event_url": f"{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event.id)}",
+        }
+
+    @staticmethod
+    async def lock_event(session: AsyncSession, event_id: int) -> None:
+        # SELECT ... FOR UPDATE строки события до конца транзакции: join, leave, смена вместимости
+        # и удаление одного события идут по очереди. В READ COMMITTED следующий запрос берёт
+        # свежий снимок и видит всё, что зафиксировали предыдущие владельцы блокировки
+        locked = await session.execute(select(Event.id).where(Event.id == event_id).with_for_update())
+        if locked.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
+            )
 
     @staticmethod
     async def join_event(session: AsyncSession, event_id: int, user: User):
-        event = await EventsService.get_event_by_id(session, event_id)
-        if not event:
+        # Под блокировкой строки события (иначе постановка в очередь полного события и
+        # параллельный leave, не увидевший её, оставили бы свободное место при ожидающих)
+        # одним запросом: место занимается условным UPDATE счётчика, и только при успехе
+        # вставляется участник. Если мест нет - пользователь встаёт в очередь.
+        # Остальные поля нужны для разбора отказа
+        await EventsService.lock_event(session, event_id)
+        is_open = Event.status.not_in([EventStatus.CANCELLED, EventStatus.COMPLETED])
+        is_invited = exists().where(EventInvitedUsers.event_id == event_id, EventInvitedUsers.user_id == user.id)
+        is_member = exists().where(EventMembers.event_id == event_id, EventMembers.user_id == user.id)
+        is_waitlisted = exists().where(EventWaitlist.event_id == event_id, EventWaitlist.user_id == user.id)
+        seat = (
+            update(Event)
+            .where(
+                Event.id == event_id,
+                is_open,
+                or_(Event.max_members.is_(None), Event.members_count < Event.max_members),
+                is_invited,
+                ~is_member,
+            )
+            .values(members_count=Event.members_count + 1, version=Event.version + 1)
+            .returning(Event.id, Event.members_count)
+            .cte("seat")
+        )
+        joined = (
+            insert(EventMembers)
+            .from_select(["event_id", "user_id"], select(seat.c.id, literal(user.id)))
+            .on_conflict_do_nothing()
+            .returning(EventMembers.event_id)
+            .cte("joined")
+        )
+        # Получивший место покидает очередь, если стоял в ней
+        unqueued = (
+            delete(EventWaitlist)
+            .where(EventWaitlist.event_id == event_id, EventWaitlist.user_id == user.id, exists(select(joined.c.event_id)))
+            .returning(EventWaitlist.id)
+            .cte("unqueued")
+        )
+        queued = (
+            insert(EventWaitlist)
+            .from_select(
+                ["event_id", "user_id"],
+                select(Event.id, literal(user.id))
+                .where(Event.id == event_id, is_open, is_invited, ~is_member, ~exists(select(seat.c.id))),
+            )
+            .on_conflict_do_nothing(index_elements=[EventWaitlist.event_id, EventWaitlist.user_id])
+            .returning(EventWaitlist.id)
+            .cte("queued")
+        )
+        result = await session.execute(
+            select(
+                Event.id,
+                Event.name,
+                Event.start_date,
+                Event.location,
+                Event.status,
+                Event.max_members,
+                func.coalesce(select(seat.c.members_count).scalar_subquery(), Event.members_count).label("members_count"),
+                is_invited.label("is_invited"),
+                is_member.label("is_member"),
+                is_waitlisted.label("is_waitlisted"),
+                exists(select(seat.c.id)).label("seat_taken"),
+                exists(select(joined.c.event_id)).label("joined"),
+                exists(select(queued.c.id)).label("queued"),
+            )
+            .where(Event.id == event_id)
+            .add_cte(unqueued)
+        )
+        membership = result.one_or_none()
+
+        if membership is not None and membership.seat_taken and not membership.joined:
+            # Место занято, но участника уже вставил параллельный join того же пользователя: откатываем счётчик
+            await session.rollback()
+        if membership is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Event not found"
             )
-        invited_user_ids = [invited_user.id for invited_user in event.invited_users]
-        if user.id not in invited_user_ids:
+        if not membership.is_invited:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User was not invited to this event"
             )
-
-        user_ids = [member.id for member in event.members]
-        if user.id in user_ids:
+        if membership.is_member or (membership.seat_taken and not membership.joined):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User already joined the event"
             )
-
-        if event.max_members is not None and len(event.members) >= event.max_members:
+        if membership.status == EventStatus.CANCELLED:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Event is full"
+                detail="Event is cancelled"
             )
-
-        if event.status == EventStatus.CANCELLED:
+        if membership.status == EventStatus.COMPLETED:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Event is cancelled"
+                detail="Event is completed"
             )
-
-        if event.status == EventStatus.COMPLETED:
+        if not (membership.joined or membership.queued or membership.is_waitlisted):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Event is completed"
+                detail="Event is full"
             )
 
-        event.members.append(user)
-        await session.commit()
+        if membership.joined:
+            # Письма админам фиксируются вместе с участием
+            await OutboxService.enqueue_for_admins(
+                session, EmailKind.EVENT_MEMBER_CONFIRMED,
+                **EventsService.member_email_payload(membership, user.name, membership.members_count),
+            )
 
-        result = await session.execute(
-            select(Event)
-            .options(selectinload(Event.members), selectinload(Event.likes), selectinload(Event.invited_users))
-            .where(Event.id == event.id)
-        )
-        return result.scalar_one()
+        await session.commit()
+        if membership.joined:
+            EventsService.invalidate_cache(event_id, user.id)
+        return membership
 
     @staticmethod
     async def leave_event(session: AsyncSession, event_id: int, user: User):
-        event = await EventsService.get_event_by_id(session, event_id)
-        if not event:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Event not found"
-            )
-
-        user_ids = [member.id for member in event.members]
-        if user.id not in user_ids:
+        # Под блокировкой строки события (см. join_event): участник удаляется вместе с уменьшением
+        # счётчика, затем освободившиеся места занимают ожидающие по общему правилу promote_waitlist -
+        # только в пределах max_members, так что после уменьшения вместимости очередь ждёт
+        await EventsService.lock_event(session, event_id)
+        left = (
+            delete(EventMembers)
+            .where(EventMembers.event_id == event_id, EventMembers.user_id == user.id)
+            .returning(EventMembers.event_id)
+            .cte("left_members")
+        )
+        result = await session.execute(
+            update(Event)
+            .where(Event.id.in_(select(left.c.event_id)))
+            .values(members_count=Event.members_count - 1, version=Event.version + 1)
+            .returning(Event.id, Event.name, Event.start_date, Event.location, Event.members_count)
+            .execution_options(synchronize_session=False)
+        )
+        left_event = result.one_or_none()
+        if left_event is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User not joined the event"
             )
 
-        event.members.remove(user)
+        promoted_user_ids = await EventsService.promote_waitlist(session, event_id)
+        await OutboxService.enqueue_for_admins(
+            session, EmailKind.EVENT_MEMBER_CANCELLED,
+            **EventsService.member_email_payload(
+                left_event, user.name, left_event.members_count + len(promoted_user_ids)
+            ),
+        )
+
         await session.commit()
+        EventsService.invalidate_cache(event_id, user.id)
+        if promoted_user_ids:
+            events_cache.invalidate_users(promoted_user_ids)
 
+        return await EventsService.get_event_with_stats(session, event_id, user.id)
+
+    @staticmethod
+    async def promote_waitlist(session: AsyncSession, event_id: int) -> List[int]:
+        # Свободные места открытого события отдаются первым в очереди одним запросом; вызывать
+        # под блокировкой строки события. Возвращает id переведённых в участники, коммит - за вызывающим
+        # Без max_members мест не ограничено: LIMIT NULL забирает всю очередь
+        free_seats = (
+            select(case(
+                (Event.max_members.is_(None), None),
+                else_=func.greatest(Event.max_members - Event.members_count, 0),
+            ))
+            .where(Event.id == event_id)
+            .scalar_subquery()
+        )
+        waiters = (
+            select(EventWaitlist.id)
+            .where(
+                EventWaitlist.event_id == event_id,
+                exists().where(
+                    Event.id == event_id,
+                    Event.status.not_in([EventStatus.CANCELLED, EventStatus.COMPLETED]),
+                ),
+            )
+            .order_by(EventWaitlist.id)
+            .limit(free_seats)
+        )
+        promoted = (
+            delete(EventWaitlist)
+            .where(EventWaitlist.id.in_(waiters))
+            .returning(EventWaitlist.event_id, EventWaitlist.user_id)
+            .cte("promoted")
+        )
+        promoted_members = (
+            insert(EventMembers)
+            .from_select(["event_id", "user_id"], select(promoted.c.event_id, promoted.c.user_id))
+            .on_conflict_do_nothing()
+            .returning(EventMembers.user_id)
+            .cte("promoted_members")
+        )
+        promoted_count = select(func.count()).select_from(promoted_members).scalar_subquery()
+        counter = (
+            update(Event)
+            .where(Event.id == event_id, promoted_count > 0)
+            .values(members_count=Event.members_count + promoted_count, version=Event.version + 1)
+            .returning(Event.id)
+            .cte("counter")
+        )
+        result = await session.execute(select(promoted_members.c.user_id).add_cte(counter))
+        user_ids = list(result.scalars().all())
+        if user_ids:
+            await NotificationsService.create_notifications_bulk(
+                session=session,
+                user_ids=user_ids,
+                event_id=event_id,
+                type=NotificationType.EVENT_WAITLIST_PROMOTED
+            )
+        return user_ids
+
+    @staticmethod
+    async def get_waitlist_state(session: AsyncSession, event_id: int, user_id: int) -> Tuple[Optional[int], int]:
+        # Позиция пользователя (с 1, None - не в очереди) и длина очереди одним запросом
+        user_entry = (
+            select(EventWaitlist.id)
+            .where(EventWaitlist.event_id == event_id, EventWaitlist.user_id == user_id)
+            .scalar_subquery()
+        )
         result = await session.execute(
-            select(Event)
-            .options(selectinload(Event.members), selectinload(Event.likes), selectinload(Event.invited_users))
-            .where(Event.id == event.id)
+            select(func.count().filter(EventWaitlist.id <= user_entry), func.count())
+            .where(EventWaitlist.event_id == event_id)
         )
-        return result.scalar_one()
+        position, size = result.one()
+        return position or None, size
 
     @staticmethod
-    async def delete_event(session: AsyncSession, event_id: int) -> bool:
-        event = await EventsService.get_event_by_id(session, event_id)
-        if not event:
+    async def leave_waitlist(session: AsyncSession, event_id: int, user: User) -> None:
+        result = await session.execute(
+            delete(EventWaitlist)
+            .where(EventWaitlist.event_id == event_id, EventWaitlist.user_id == user.id)
+            .returning(EventWaitlist.id)
+        )
+        if result.scalar_one_or_none() is None:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Event not found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User is not in the waitlist"
             )
-        members = event.members
-        for member in members:
-            await EventsService.leave_event(session, event_id, member)
-        await session.delete(event)
         await session.commit()
+
+    @staticmethod
+    async def delete_event(session: AsyncSession, event_id: int) -> bool:
+        # Блокировка строки события не даёт параллельному join/like добавить зависимую строку,
+        # пока идёт удаление. Дальше по одному DELETE на таблицу (у всех индекс начинается с
+        # event_id), ещё не отправленные письма о событии и само событие - всё в одной транзакции
+        await EventsService.lock_event(session, event_id)
+        await OutboxService.cancel_for_event(session, event_id)
+
+        for model in (EventMembers, EventWaitlist, EventLikes, EventInvitedUsers, EventComments, Notification):
+            await session.execute(
+                delete(model).where(model.event_id == event_id).execution_options(synchronize_session=False)
+            )
+        await session.execute(delete(Event).where(Event.id == event_id).execution_options(synchronize_session=False))
+        await session.commit()
+        events_cache.invalidate_events([event_id])
         return True
 
     @staticmethod
@@ -251,19 +810,30 @@ class EventsService:
         event.city = event_request.city if event_request.city else event.city
         event.location = event_request.location if event_request.location else event.location
         event.status = event_request.status if event_request.status else event.status
+        event.version = Event.version + 1
+        # UPDATE события блокирует его строку, после него очередь видит новую вместимость:
+        # если мест стало больше, их занимают первые ожидающие
+        await session.flush()
+        promoted_user_ids = await EventsService.promote_waitlist(session, event.id)
         await session.commit()
-        await session.refresh(event)
-        return event
+
+        # Изменение дат/статуса/города может перенести событие в другие выборки,
+        # поэтому сбрасываем и записи с этим событием, и выборки всех, кто его видит
+        invited_user_ids = await EventsService.get_invited_user_ids(session, event.id)
+        events_cache.invalidate_events([event.id])
+        events_cache.invalidate_users(invited_user_ids + promoted_user_ids, include_admins=True)
+        return await EventsService.get_event_with_stats(session, event.id)
 
     @staticmethod
     async def get_event_members(session: AsyncSession, event_id: int) -> List[User]:
-        event = await EventsService.get_event_by_id(session, event_id)
-        if not event:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Event not found"
-            )
-        return event.members
+        await EventsService.get_event_version(session, event_id)
+        result = await session.execute(
+            select(User)
+            .join(EventMembers, EventMembers.user_id == User.id)
+            .where(EventMembers.event_id == event_id)
+            .order_by(User.id)
+        )
+        return result.scalars().all()
 
     @staticmethod
     async def export_event_members_to_csv(session: AsyncSession, event_id: int) -> str:
@@ -293,52 +863,94 @@ class EventsService:
         return str(excel_path)
 
     @staticmethod
-    async def like_event(session: AsyncSession, event_id: int, user: User):
-        event = await EventsService.get_event_by_id(session, event_id)
-        user_ids = [like.id for like in event.likes]
-        if user.id in user_ids:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User already liked the event"
+    async def set_like(session: AsyncSession, event_id: int, user: User, liked: bool) -> int:
+        # Один запрос: вставка/удаление в event_likes и, только если строка реально изменилась,
+        # сдвиг счётчика. Повтор того же запроса ничего не меняет; возвращается актуальный likes_count
+        if liked:
+            changed = (
+                insert(EventLikes)
+                .from_select(["event_id", "user_id"], select(Event.id, literal(user.id)).where(Event.id == event_id))
+                .on_conflict_do_nothing()
+                .returning(EventLikes.event_id)
+                .cte("changed")
             )
-        event.likes.append(user)
-        await session.commit()
+            delta = 1
+        else:
+            changed = (
+                delete(EventLikes)
+                .where(EventLikes.event_id == event_id, EventLikes.user_id == user.id)
+                .returning(EventLikes.event_id)
+                .cte("changed")
+            )
+            delta = -1
+        counter = (
+            update(Event)
+            .where(Event.id.in_(select(changed.c.event_id)))
+            .values(likes_count=Event.likes_count + delta, version=Event.version + 1)
+            .returning(Event.likes_count)
+            .cte("counter")
+        )
         result = await session.execute(
-            select(Event)
-            .options(selectinload(Event.members), selectinload(Event.likes), selectinload(Event.invited_users))
-            .where(Event.id == event.id)
+            select(
+                func.coalesce(select(counter.c.likes_count).scalar_subquery(), Event.likes_count),
+                exists(select(counter.c.likes_count)),
+            ).where(Event.id == event_id)
         )
-        return result.scalar_one()
-
-    @staticmethod
-    async def unlike_event(session: AsyncSession, event_id: int, user: User):
-        event = await EventsService.get_event_by_id(session, event_id)
-
-        user_ids = [like.id for like in event.likes]
-        if user.id not in user_ids:
+        row = result.one_or_none()
+        if row is None:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User not liked the event"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
             )
-        event.likes.remove(user)
+        likes_count, is_changed = row
+
         await session.commit()
-        result = await session.execute(
-            select(Event)
-            .options(selectinload(Event.members), selectinload(Event.likes), selectinload(Event.invited_users))
-            .where(Event.id == event.id)
-        )
-        return result.scalar_one()
+        if is_changed:
+            EventsService.invalidate_cache(event_id, user.id)
+        return likes_count
+
+    @staticmethod
+    async def like_event(session: AsyncSession, event_id: int, user: User) -> int:
+        return await EventsService.set_like(session, event_id, user, liked=True)
+
+    @staticmethod
+    async def unlike_event(session: AsyncSession, event_id: int, user: User) -> int:
+        return await EventsService.set_like(session, event_id, user, liked=False)
 
     @staticmethod
-    async def get_liked_events(session: AsyncSession, user: User, is_admin: bool = False) -> List[Event]:
-        query = select(Event).options(selectinload(Event.likes), selectinload(Event.members), selectinload(Event.invited_users))
-        query = query.where(Event.likes.contains(user))
+    async def get_liked_events(
+        session: AsyncSession,
+        user: User,
+        is_admin: bool = False,
+        view: EventView = EventView.DETAIL,
+        limit: Optional[int] = None,
+    ) -> List[Event]:
+        query = EventsService.limit_events(EventsService.build_liked_events_query(user, is_admin=is_admin), limit)
+        query = EventsService.with_view(query, view)
+        result = await session.execute(EventsService.with_stats(query, user.id))
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_liked_events_page(
+        session: AsyncSession,
+        user: User,
+        limit: int,
+        cursor: Optional[str] = None,
+        is_admin: bool = False,
+        view: EventView = EventView.DETAIL,
+    ) -> Tuple[List[Event], Optional[str]]:
+        query = EventsService.with_view(EventsService.build_liked_events_query(user, is_admin=is_admin), view)
+        query = EventsService.with_stats(query, user.id)
+        return await EventsService.paginate_events(session, query, limit=limit, cursor=cursor)
+
+    @staticmethod
+    def build_liked_events_query(user: User, is_admin: bool = False) -> Select:
+        query = select(Event).where(Event.likes.contains(user))
         
         if not is_admin:
             query = query.join(EventInvitedUsers).where(EventInvitedUsers.user_id == user.id).distinct()
         
-        result = await session.execute(query)
-        return result.scalars().all()
+        return query
 
     @staticmethod
     async def comment_event(session: AsyncSession, event_id: int, user: User, comment: EventCommentRequest):
@@ -349,7 +961,7 @@ class EventsService:
                 detail="Event not found"
             )
 
-        if user.id not in [member.id for member in event.members]:
+        if not await EventsService.is_user_member(session, event_id, user.id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User not a member of the event"
@@ -381,12 +993,7 @@ class EventsService:
         )
         session.add(comment_obj)
         await session.commit()
-        result = await session.execute(
-            select(Event)
-            .options(selectinload(Event.members), selectinload(Event.likes), selectinload(Event.comments), selectinload(Event.invited_users))
-            .where(Event.id == event_id)
-        )
-        return result.scalar_one()
+        return await EventsService.get_event_with_stats(session, event_id, user.id)
     
     @staticmethod
     async def get_comments_for_event(session: AsyncSession, event_id: int) -> List[EventComments]:
@@ -24,3 +24,7 @@ class ImagesService:
 
         # Возвращаем относительный путь для URL
         return f"/images/{image_name}"
+
+    @staticmethod
+    def delete_image(image_path: str) -> None:
+        (settings.IMAGES_DIR / image_path.rsplit("/", 1)[-1]).unlink(missing_ok=True)
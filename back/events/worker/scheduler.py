@@ -0,0 +1,51 @@
+"""Планировщик периодических заданий по событиям. Запускается отдельным процессом:
+
+    python -m events.worker.scheduler
+
+Выполняет задания из events.scheduler.events: смену статусов с напоминаниями и
+рассылками (update_events) и сверку счётчиков участников и лайков
+(reconcile_event_counters). В API планировщик не запускается, иначе каждый воркер
+uvicorn выполнял бы задания заново; каждое задание к тому же берёт advisory-блокировку,
+так что второй экземпляр планировщика не повторит уже идущую работу. Сбросы кэша
+событий доходят до процессов API через events_cache_sync.
+"""
+import asyncio
+import logging
+import signal
+
+from events.scheduler.events import scheduler
+from events.services.cache import events_cache_sync
+from main.db.db import engine, init_db
+
+logger = logging.getLogger(__name__)
+
+
+async def run() -> None:
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await init_db()
+    await events_cache_sync.start()
+    scheduler.start()
+    logger.info("Events scheduler started")
+    try:
+        await stopping.wait()
+    finally:
+        scheduler.shutdown(wait=False)
+        await events_cache_sync.stop()
+        await engine.dispose()
+        logger.info("Events scheduler stopped")
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,32 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str
     SMTP_FROM_EMAIL: str
     SMTP_FROM_NAME: str
+    SMTP_START_TLS: bool = True
+    SMTP_TIMEOUT_SECONDS: float = 30
+    SMTP_POOL_SIZE: int = 5
+    SMTP_POOL_IDLE_TIMEOUT_SECONDS: float = 60
+    SMTP_POOL_HEALTH_CHECK_SECONDS: float = 15
+    SMTP_POOL_MAX_MESSAGES: int = 100
+    # Перечитывать изменённые шаблоны писем на лету, только для разработки
+    EMAIL_TEMPLATES_RELOAD: bool = False
+
+    EMAIL_OUTBOX_BATCH_SIZE: int = 500
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2
+    EMAIL_OUTBOX_LEASE_SECONDS: float = 300
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_BACKOFF_BASE_SECONDS: float = 30
+    EMAIL_OUTBOX_BACKOFF_MAX_SECONDS: float = 3600
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 14
+    EMAIL_OUTBOX_PURGE_INTERVAL_SECONDS: float = 3600
+
+    STREAM_BATCH_SIZE: int = 500
+
+    EVENTS_MEMBERS_PREVIEW_SIZE: int = 5
+    EVENTS_LIST_MAX_SIZE: int = 1000
+
+    EVENTS_CACHE_MAX_SIZE: int = 1024
+    EVENTS_CACHE_TTL_SECONDS: float = 30
+    EVENTS_CACHE_SYNC_RETRY_SECONDS: float = 5
 
     PWD_CONTEXT: CryptContext = CryptContext(schemes=["argon2"], deprecated="auto")
 
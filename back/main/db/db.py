@@ -1,10 +1,13 @@
 from typing import Annotated, AsyncGenerator
 
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from fastapi import Depends
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from main.config.settings import settings
-from main.models.base import Base
+from main.db.migrate import get_alembic_config
 
 engine = create_async_engine(settings.DATABASE_URL)
 SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
@@ -16,11 +19,22 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    
-    # Загружаем фикстуры после создания таблиц
-    from main.fixtures.loader import load_fixtures
-    await load_fixtures()
+    # Схему меняет только python -m main.db.migrate; воркер лишь проверяет, что база на нужной ревизии
+    expected = ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+    async with engine.connect() as conn:
+        current = await conn.run_sync(
+            lambda sync_conn: MigrationContext.configure(sync_conn).get_current_revision()
+        )
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema revision is {current}, expected {expected}. Run `python -m main.db.migrate`"
+        )
+
+
+async def try_advisory_xact_lock(session: AsyncSession, name: str) -> bool:
+    # Блокировка на время транзакции сессии: из нескольких процессов, запустивших
+    # одно и то же задание, работу сделает только получивший её
+    result = await session.execute(select(func.pg_try_advisory_xact_lock(func.hashtext(name))))
+    return result.scalar()
 
 SessionDependency = Annotated[AsyncSession, Depends(get_async_session)]
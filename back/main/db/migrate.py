@@ -0,0 +1,36 @@
+"""Применяет миграции и загружает фикстуры. Запускается один раз на деплой,
+до старта воркеров API:
+
+    python -m main.db.migrate
+"""
+import asyncio
+import logging
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+logger = logging.getLogger(__name__)
+
+
+def get_alembic_config() -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "main" / "db" / "migrations"))
+    return config
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    command.upgrade(get_alembic_config(), "head")
+
+    from main.fixtures.loader import load_fixtures
+    asyncio.run(load_fixtures())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import asyncio
+
+from alembic import context
+from sqlalchemy.engine import Connection
+
+from main.db.db import engine
+from main.models.base import Base
+
+# Модели нужны в metadata для alembic revision --autogenerate
+import events.models.events  # noqa: F401
+import main.models.fixtures  # noqa: F401
+import notifications.models.notifications  # noqa: F401
+import notifications.models.outbox  # noqa: F401
+import users.models.user  # noqa: F401
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
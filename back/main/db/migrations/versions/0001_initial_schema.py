@@ -0,0 +1,169 @@
+"""initial schema
+
+Создаёт схему с нуля или, если таблицы уже созданы прежним
+Base.metadata.create_all, доводит такую базу до той же схемы.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EVENT_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(short_description, '')), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(description, '')), 'C')"
+)
+
+EVENT_STATUSES = ('COMING_SOON', 'ACTIVE', 'COMPLETED', 'CANCELLED')
+EVENT_TYPES = (
+    'BIRTHDAY', 'PARTY', 'MEETING', 'TRAINING', 'CONFERENCE', 'WORKSHOP',
+    'SEMINAR', 'CONCERT', 'FESTIVAL', 'EXCURSION', 'TOUR', 'OTHER',
+)
+EVENT_CITIES = (
+    'MOSCOW', 'ST_PETERSBURG', 'NOVOSIBIRSK', 'YEKATERINBURG', 'KRASNODAR', 'SAMARA', 'UFA',
+    'VOLGOGRAD', 'KAZAN', 'RYAZAN', 'SARATOV', 'TOLYATTI', 'ROSTOV_ON_DON', 'MINSK', 'GOMEL',
+    'BREST', 'VITEBSK', 'GRODNO', 'MOGILEV',
+)
+NOTIFICATION_TYPES = ('EVENT_CREATED', 'EVENT_UPDATED', 'EVENT_REVIEW', 'EVENT_CANCELLED', 'EVENT_REMINDER_24H')
+
+# Индексы, которые create_all строил по старым моделям (index=True и дубли Index(...))
+LEGACY_INDEXES = (
+    'ix_events_id', 'ix_events_name', 'ix_events_image_url', 'ix_events_start_date', 'ix_events_end_date',
+    'ix_events_short_description', 'ix_events_description', 'ix_events_city', 'ix_events_type',
+    'ix_events_status', 'idx_event_name', 'idx_event_image_url', 'idx_event_start_date',
+    'idx_event_members_event_id', 'idx_event_members_user_id',
+    'idx_event_invited_users_event_id', 'idx_event_invited_users_user_id',
+    'idx_event_likes_event_id', 'idx_event_likes_user_id',
+    'idx_event_comments_event_id', 'idx_event_comments_user_id',
+    'ix_users_id', 'ix_users_name', 'ix_users_surname', 'ix_users_father_name', 'ix_users_role',
+    'ix_users_status', 'idx_user_name_surname', 'idx_user_full_name',
+    'ix_notifications_id',
+)
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_event_start_date_id ON events (start_date, id)",
+    "CREATE INDEX IF NOT EXISTS idx_event_open_start_date_id ON events (start_date, id) "
+    "WHERE status <> 'COMPLETED' AND status <> 'CANCELLED'",
+    "CREATE INDEX IF NOT EXISTS idx_event_end_date ON events (end_date)",
+    "CREATE INDEX IF NOT EXISTS idx_event_status ON events (status)",
+    "CREATE INDEX IF NOT EXISTS idx_event_city ON events (city)",
+    "CREATE INDEX IF NOT EXISTS idx_event_type ON events (type)",
+    "CREATE INDEX IF NOT EXISTS idx_event_search_vector ON events USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS idx_event_name_trgm ON events USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_event_members_user_id_event_id ON event_members (user_id, event_id)",
+    "CREATE INDEX IF NOT EXISTS idx_event_invited_users_user_id_event_id ON event_invited_users (user_id, event_id)",
+    "CREATE INDEX IF NOT EXISTS idx_event_likes_user_id_event_id ON event_likes (user_id, event_id)",
+    "CREATE INDEX IF NOT EXISTS idx_user_admin ON users (id) WHERE role = 'ADMIN'",
+    "CREATE INDEX IF NOT EXISTS idx_notification_user_unread_created_at ON notifications (user_id, created_at) "
+    "WHERE is_read = false",
+    "CREATE INDEX IF NOT EXISTS idx_notification_event_id ON notifications (event_id)",
+)
+
+
+def base_columns() -> list[sa.Column]:
+    # Колонки main.models.base.BaseModel
+    return [
+        sa.Column('id', sa.BigInteger(), primary_key=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    ]
+
+
+def link_table(name: str) -> None:
+    op.create_table(
+        name,
+        sa.Column('event_id', sa.Integer(), sa.ForeignKey('events.id'), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+    )
+
+
+def create_schema() -> None:
+    op.create_table(
+        'users',
+        *base_columns(),
+        sa.Column('name', sa.String(128)),
+        sa.Column('surname', sa.String(128)),
+        sa.Column('father_name', sa.String(128), nullable=True),
+        sa.Column('email', sa.String(128)),
+        sa.Column('role', sa.Enum('USER', 'ADMIN', name='userrole')),
+        sa.Column('status', sa.Enum('ACTIVE', 'DELETED', name='userstatus')),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'events',
+        *base_columns(),
+        sa.Column('name', sa.String(128), nullable=False),
+        sa.Column('image_url', sa.String(1024), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=True),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('short_description', sa.String(128), nullable=True),
+        sa.Column('description', sa.String(1024), nullable=False),
+        sa.Column('pay_data', sa.String(2048), nullable=True),
+        sa.Column('max_members', sa.Integer(), nullable=True),
+        sa.Column('city', sa.Enum(*EVENT_CITIES, name='eventcity'), nullable=True),
+        sa.Column('location', sa.String(512), nullable=True),
+        sa.Column('type', sa.Enum(*EVENT_TYPES, name='eventtype'), nullable=False),
+        sa.Column('status', sa.Enum(*EVENT_STATUSES, name='eventstatus')),
+        sa.Column('version', sa.Integer(), nullable=False, server_default=sa.text('1')),
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(EVENT_SEARCH_VECTOR, persisted=True)),
+    )
+
+    link_table('event_members')
+    link_table('event_invited_users')
+    link_table('event_likes')
+
+    op.create_table(
+        'event_comments',
+        sa.Column('event_id', sa.Integer(), sa.ForeignKey('events.id'), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('comment', sa.String(1024), nullable=False),
+        sa.Column('rating', sa.Integer(), nullable=True),
+    )
+
+    op.create_table(
+        'notifications',
+        *base_columns(),
+        sa.Column('user_id', sa.BigInteger(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('event_id', sa.BigInteger(), sa.ForeignKey('events.id'), nullable=False),
+        sa.Column('type', sa.Enum(*NOTIFICATION_TYPES, name='notificationtype'), nullable=False),
+        sa.Column('is_read', sa.Boolean()),
+    )
+
+
+def adopt_legacy_schema() -> None:
+    op.execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1")
+    op.execute(
+        "ALTER TABLE events ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({EVENT_SEARCH_VECTOR}) STORED"
+    )
+    for index_name in LEGACY_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    if sa.inspect(op.get_bind()).has_table('events'):
+        adopt_legacy_schema()
+    else:
+        create_schema()
+    for statement in INDEXES:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for table in ('notifications', 'event_comments', 'event_likes', 'event_invited_users', 'event_members', 'events', 'users'):
+        op.drop_table(table)
+    for enum_name in ('notificationtype', 'eventstatus', 'eventtype', 'eventcity', 'userstatus', 'userrole'):
+        op.execute(f"DROP TYPE IF EXISTS {enum_name}")
@@ -0,0 +1,30 @@
+"""fixture state
+
+Хранит отпечаток загруженных фикстур, чтобы не загружать их повторно.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'fixture_state',
+        sa.Column('name', sa.String(64), primary_key=True),
+        sa.Column('fingerprint', sa.String(64), nullable=False),
+        sa.Column('loaded_at', sa.DateTime()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('fixture_state')
@@ -0,0 +1,30 @@
+"""event members count
+
+Счётчик участников в events: по нему join атомарно проверяет вместимость.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('events', sa.Column('members_count', sa.Integer(), nullable=False, server_default=sa.text('0')))
+    op.execute(
+        "UPDATE events SET members_count = counts.members_count "
+        "FROM (SELECT event_id, count(*) AS members_count FROM event_members GROUP BY event_id) AS counts "
+        "WHERE events.id = counts.event_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('events', 'members_count')
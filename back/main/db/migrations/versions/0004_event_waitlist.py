@@ -0,0 +1,36 @@
+"""event waitlist
+
+Очередь ожидания на заполненные события и тип уведомления о переводе в участники.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TYPE notificationtype ADD VALUE IF NOT EXISTS 'EVENT_WAITLIST_PROMOTED'")
+    op.create_table(
+        'event_waitlist',
+        sa.Column('id', sa.BigInteger(), primary_key=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.Column('event_id', sa.BigInteger(), sa.ForeignKey('events.id'), nullable=False),
+        sa.Column('user_id', sa.BigInteger(), sa.ForeignKey('users.id'), nullable=False),
+        sa.UniqueConstraint('event_id', 'user_id', name='uq_event_waitlist_event_id_user_id'),
+    )
+    op.create_index('idx_event_waitlist_event_id_id', 'event_waitlist', ['event_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_table('event_waitlist')
+    # Значение из enum в PostgreSQL не удаляется; EVENT_WAITLIST_PROMOTED остаётся неиспользуемым
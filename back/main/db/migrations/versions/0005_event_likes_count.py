@@ -0,0 +1,30 @@
+"""event likes count
+
+Денормализованный счётчик лайков в events, как members_count.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('events', sa.Column('likes_count', sa.Integer(), nullable=False, server_default=sa.text('0')))
+    op.execute(
+        "UPDATE events SET likes_count = counts.likes_count "
+        "FROM (SELECT event_id, count(*) AS likes_count FROM event_likes GROUP BY event_id) AS counts "
+        "WHERE events.id = counts.event_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('events', 'likes_count')
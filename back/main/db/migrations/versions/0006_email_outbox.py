@@ -0,0 +1,52 @@
+"""email outbox
+
+Исходящие письма пишутся в таблицу в транзакции бизнес-изменения и доставляются
+отдельным воркером.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMAIL_KINDS = (
+    'VERIFICATION', 'PASSWORD_RESET', 'PASSWORD_RESET_SUCCESS', 'WELCOME', 'EVENT_CREATED',
+    'EVENT_MEMBER_CANCELLED', 'EVENT_MEMBER_CONFIRMED', 'EVENT_REMINDER_24H', 'EVENT_UPDATED',
+    'EVENT_CANCELLED', 'ADMIN_RESET_PASSWORD', 'EVENT_REVIEW',
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'email_outbox',
+        sa.Column('id', sa.BigInteger(), primary_key=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.Column('email', sa.String(128), nullable=False),
+        sa.Column('kind', sa.Enum(*EMAIL_KINDS, name='emailkind'), nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'SENT', 'DEAD', name='emailoutboxstatus'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.String(1024), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        'idx_email_outbox_pending_next_attempt_at', 'email_outbox', ['next_attempt_at', 'id'],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('email_outbox')
+    for enum_name in ('emailoutboxstatus', 'emailkind'):
+        op.execute(f"DROP TYPE IF EXISTS {enum_name}")
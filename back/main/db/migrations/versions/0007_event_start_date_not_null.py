@@ -0,0 +1,27 @@
+"""event start_date not null
+
+Keyset-пагинация идёт по (start_date, id): NULL в start_date ломал курсор и выпадал
+из сравнения кортежей. Даты начала без значения заполняются датой окончания.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE events SET start_date = end_date WHERE start_date IS NULL")
+    op.alter_column('events', 'start_date', existing_type=sa.Date(), nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('events', 'start_date', existing_type=sa.Date(), nullable=True)
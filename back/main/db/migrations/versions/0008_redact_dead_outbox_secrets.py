@@ -0,0 +1,28 @@
+"""redact dead outbox secrets
+
+Письма в статусе DEAD больше не отправляются: коды, токены и пароли из их payload
+удаляются (новые мёртвые письма чистит OutboxService.mark_failed).
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "UPDATE email_outbox SET payload = payload - ARRAY['verification_code', 'reset_token', 'new_password'] "
+        "WHERE status = 'DEAD'"
+    )
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,28 @@
+"""email outbox retention
+
+Индекс для очистки доставленных и мёртвых писем по сроку хранения.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_email_outbox_done_updated_at', 'email_outbox', ['updated_at'],
+        postgresql_where=sa.text("status IN ('SENT', 'DEAD')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_email_outbox_done_updated_at', table_name='email_outbox')
@@ -2,13 +2,16 @@ import random
 from datetime import date, timedelta
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from events.enums.events import EventCity, EventStatus, EventType
 from events.models.events import Event, EventComments, EventInvitedUsers, EventLikes, EventMembers
 from notifications.enums.notifications import NotificationType
-from notifications.services.notifications import NotificationsService
-from users.models.user import User
+from notifications.models.notifications import Notification
+
+# Фиксированное зерно: одинаковые фикстуры дают одинаковый отпечаток и не перезагружаются
+FIXTURES_SEED = 20240101
 
 # Шаблоны отзывов для разных типов событий
 COMMENT_TEMPLATES = {
@@ -92,19 +95,14 @@ COMMENT_TEMPLATES = {
 }
 
 
-async def create_events_fixtures(session: AsyncSession, users: list[User]) -> list[Event]:
-    """Создает тестовые события для разработки"""
-    
-    if not users:
+def build_events_data(regular_emails: list[str]) -> list[dict]:
+    """Генерирует описание тестовых событий. Даты заданы смещением в днях от сегодняшнего дня"""
+
+    if not regular_emails:
         return []
-    
-    # Находим админа для создания событий
-    admin = next((u for u in users if u.role.value == "admin"), users[0])
-    regular_users = [u for u in users if u.role.value == "user"]
-    
-    today = date.today()
-    
-    # Базовые шаблоны событий
+
+    rng = random.Random(FIXTURES_SEED)
+
     event_templates = [
         {
             "names": ["День рождения в парке", "Празднование дня рождения", "День рождения на природе", "Торжество в честь дня рождения"],
@@ -265,83 +263,79 @@ async def create_events_fixtures(session: AsyncSession, users: list[User]) -> li
         },
     ]
     
+
+    image_urls = [f"images/image{i}.png" for i in range(1, 11)]
+    prices = [500, 1000, 1500, 2000, 3000, 5000, 8000, 10000, 15000]
+
     events_data = []
-    
+
     # Определяем, какие события будут завершенными (примерно 50%)
     total_events = 50
     completed_count = total_events // 2  # 25 завершенных событий
-    completed_indices = set(random.sample(range(total_events), completed_count))
-    
-    # Создаем 50 событий
-    for i in range(50):
-        template = random.choice(event_templates)
-        name = random.choice(template["names"])
-        short_desc = random.choice(template["short_descriptions"])
-        desc = random.choice(template["descriptions"])
-        city = random.choice(template["cities"])
-        location = random.choice(template["locations"])
-        
+    completed_indices = set(rng.sample(range(total_events), completed_count))
+
+    for i in range(total_events):
+        template = rng.choice(event_templates)
+        name = rng.choice(template["names"])
+        short_desc = rng.choice(template["short_descriptions"])
+        desc = rng.choice(template["descriptions"])
+        city = rng.choice(template["cities"])
+        location = rng.choice(template["locations"])
+
         # Уникализируем название
         if i > 0:
             name = f"{name} #{i+1}"
-        
-        days_offset = random.randint(*template["days_range"])
-        start_date = today + timedelta(days=days_offset)
-        
-        # Определяем длительность события
-        if "duration" in template:
-            duration = random.randint(*template["duration"])
-        else:
-            duration = 1
-        
-        end_date = start_date + timedelta(days=duration - 1)
-        
+
+        days_offset = rng.randint(*template["days_range"])
+        duration = rng.randint(*template["duration"]) if "duration" in template else 1
+
         # Определяем статус
         # Если событие должно быть завершенным (50% событий)
         if i in completed_indices:
-            start_date = today - timedelta(days=random.randint(5, 30))
-            end_date = start_date + timedelta(days=duration - 1)
+            start_offset = -rng.randint(5, 30)
             status = EventStatus.COMPLETED
-        elif start_date <= today:
-            status = EventStatus.ACTIVE
         elif days_offset > 30:
+            start_offset = days_offset
             status = EventStatus.COMING_SOON
         else:
-            status = random.choice([EventStatus.COMING_SOON, EventStatus.ACTIVE])
-        
-        max_members = random.randint(*template["max_members_range"])
-        
+            start_offset = days_offset
+            status = rng.choice([EventStatus.COMING_SOON, EventStatus.ACTIVE])
+
+        max_members = rng.randint(*template["max_members_range"])
+
         # Случайные приглашенные пользователи
-        num_invited = random.randint(2, min(8, len(regular_users)))
-        invited_indices = random.sample(range(len(regular_users)), num_invited)
-        
+        num_invited = rng.randint(2, min(8, len(regular_emails)))
+        invited = rng.sample(regular_emails, num_invited)
+
         pay_data = None
-        if random.random() > 0.3:  # 70% событий платные
-            prices = [500, 1000, 1500, 2000, 3000, 5000, 8000, 10000, 15000]
-            price = random.choice(prices)
-            pay_data = f"Стоимость: {price} руб."
-        
-        image_urls = [
-            "images/image1.png",
-            "images/image2.png",
-            "images/image3.png",
-            "images/image4.png",
-            "images/image5.png",
-            "images/image6.png",
-            "images/image7.png",
-            "images/image8.png",
-            "images/image9.png",
-            "images/image10.png",
-        ]
-        
-        image_url = random.choice(image_urls)
+        if rng.random() > 0.3:  # 70% событий платные
+            pay_data = f"Стоимость: {rng.choice(prices)} руб."
+
+        image_url = rng.choice(image_urls)
+
+        # Некоторые приглашенные присоединяются к событиям
+        members = []
+        if rng.random() > 0.3:  # 70% событий имеют участников
+            members = rng.sample(invited, rng.randint(1, min(5, len(invited))))
+
+        # Некоторые приглашенные лайкают события
+        likes = []
+        if rng.random() > 0.4:  # 60% событий имеют лайки
+            likes = rng.sample(invited, rng.randint(1, min(4, len(invited))))
+
+        # Отзывы на завершенные события от 1-5 участников
+        comments = []
+        if status == EventStatus.COMPLETED and members:
+            comment_templates = COMMENT_TEMPLATES.get(template["type"], COMMENT_TEMPLATES[EventType.MEETING])
+            for email in rng.sample(members, rng.randint(1, min(5, len(members)))):
+                comments.append({"email": email, **rng.choice(comment_templates)})
 
         events_data.append({
             "name": name,
             "short_description": short_desc,
             "description": desc,
-            "start_date": start_date,
-            "end_date": end_date,
+            "start_offset": start_offset,
+            "end_offset": start_offset + duration - 1,
             "city": city,
             "location": f"{location}, {city.value}",
             "type": template["type"],
@@ -349,143 +343,92 @@ async def create_events_fixtures(session: AsyncSession, users: list[User]) -> li
             "max_members": max_members,
             "image_url": image_url,
             "pay_data": pay_data,
-            "invited_user_indices": invited_indices,
+            "invited": invited,
+            "members": members,
+            "likes": likes,
+            "comments": comments,
         })
-    
-    events = []
-    for event_data in events_data:
-        # Проверяем, существует ли событие
-        result = await session.execute(
-            select(Event).where(Event.name == event_data["name"])
-        )
-        existing_event = result.scalar_one_or_none()
-        
-        if existing_event:
-            events.append(existing_event)
-            continue
-        
-        # Создаем новое событие
-        event = Event(
-            name=event_data["name"],
-            short_description=event_data["short_description"],
-            description=event_data["description"],
-            start_date=event_data["start_date"],
-            end_date=event_data["end_date"],
-            city=event_data["city"],
-            location=event_data["location"],
-            type=event_data["type"],
-            status=event_data["status"],
-            max_members=event_data["max_members"],
-            image_url=event_data["image_url"],
-            pay_data=event_data["pay_data"],
+
+    return events_data
+
+
+async def create_events_fixtures(session: AsyncSession, events_data: list[dict], user_ids: dict[str, int]) -> int:
+    """Создает тестовые события одним INSERT на таблицу, возвращает число новых событий.
+
+    События, уже существующие по названию, пропускаются вместе со связями.
+    """
+
+    if not events_data:
+        return 0
+
+    result = await session.execute(
+        select(Event.name).where(Event.name.in_([event["name"] for event in events_data]))
+    )
+    existing_names = set(result.scalars().all())
+    new_events = [event for event in events_data if event["name"] not in existing_names]
+    if not new_events:
+        return 0
+
+    today = date.today()
+    result = await session.execute(
+        insert(Event)
+        .values([
+            {
+                "name": event["name"],
+                "short_description": event["short_description"],
+                "description": event["description"],
+                "start_date": today + timedelta(days=event["start_offset"]),
+                "end_date": today + timedelta(days=event["end_offset"]),
+                "city": event["city"],
+                "location": event["location"],
+                "type": event["type"],
+                "status": event["status"],
+                "max_members": event["max_members"],
+                "image_url": event["image_url"],
+                "pay_data": event["pay_data"],
+                "members_count": len(event["members"]),
+                "likes_count": len(event["likes"]),
+            }
+            for event in new_events
+        ])
+        .returning(Event.name, Event.id)
+    )
+    event_ids = dict(result.all())
+
+    def links(key: str) -> list[dict]:
+        return [
+            {"event_id": event_ids[event["name"]], "user_id": user_ids[email]}
+            for event in new_events
+            for email in event[key]
+        ]
+
+    invitations = links("invited")
+    for model, rows in (
+        (EventInvitedUsers, invitations),
+        (EventMembers, links("members")),
+        (EventLikes, links("likes")),
+    ):
+        if rows:
+            await session.execute(insert(model).values(rows).on_conflict_do_nothing())
+
+    comments = [
+        {
+            "event_id": event_ids[event["name"]],
+            "user_id": user_ids[comment["email"]],
+            "comment": comment["comment"],
+            "rating": comment["rating"],
+        }
+        for event in new_events
+        for comment in event["comments"]
+    ]
+    if comments:
+        await session.execute(insert(EventComments).values(comments).on_conflict_do_nothing())
+
+    if invitations:
+        await session.execute(
+            insert(Notification).values([
+                {**invitation, "type": NotificationType.EVENT_CREATED} for invitation in invitations
+            ])
         )
-        session.add(event)
-        await session.commit()
-        await session.refresh(event)
-        
-        # Добавляем приглашенных пользователей (только если событие новое)
-        invited_indices = event_data.get("invited_user_indices", [])
-        for idx in invited_indices:
-            if idx < len(regular_users):
-                # Проверяем, не добавлен ли уже этот пользователь
-                check_result = await session.execute(
-                    select(EventInvitedUsers).where(
-                        EventInvitedUsers.event_id == event.id,
-                        EventInvitedUsers.user_id == regular_users[idx].id
-                    )
-                )
-                if not check_result.scalar_one_or_none():
-                    invited_user = EventInvitedUsers(
-                        event_id=event.id,
-                        user_id=regular_users[idx].id
-                    )
-                    session.add(invited_user)
-                
-                    await NotificationsService.create_notification(
-                        session=session,
-                        user_id=regular_users[idx].id,
-                        event_id=event.id,
-                        type=NotificationType.EVENT_CREATED
-                    )
-        
-        # Некоторые пользователи присоединяются к событиям
-        if len(regular_users) > 0 and random.random() > 0.3:  # 70% событий имеют участников
-            num_members = random.randint(1, min(5, len(invited_indices)))
-            selected_indices = random.sample(invited_indices, num_members)
-            for idx in selected_indices:
-                if idx < len(regular_users):
-                    # Проверяем, не присоединился ли уже этот пользователь
-                    check_result = await session.execute(
-                        select(EventMembers).where(
-                            EventMembers.event_id == event.id,
-                            EventMembers.user_id == regular_users[idx].id
-                        )
-                    )
-                    if not check_result.scalar_one_or_none():
-                        member = EventMembers(
-                            event_id=event.id,
-                            user_id=regular_users[idx].id
-                        )
-                        session.add(member)
-        
-        # Некоторые пользователи лайкают события
-        if len(regular_users) > 0 and random.random() > 0.4:  # 60% событий имеют лайки
-            num_likes = random.randint(1, min(4, len(invited_indices)))
-            selected_indices = random.sample(invited_indices, num_likes)
-            for idx in selected_indices:
-                if idx < len(regular_users):
-                    # Проверяем, не лайкнул ли уже этот пользователь
-                    check_result = await session.execute(
-                        select(EventLikes).where(
-                            EventLikes.event_id == event.id,
-                            EventLikes.user_id == regular_users[idx].id
-                        )
-                    )
-                    if not check_result.scalar_one_or_none():
-                        like = EventLikes(
-                            event_id=event.id,
-                            user_id=regular_users[idx].id
-                        )
-                        session.add(like)
-        
-        await session.commit()
-        
-        # Добавляем отзывы на каждое завершенное событие (от 1 до 5 отзывов)
-        if event.status == EventStatus.COMPLETED and len(regular_users) > 0:
-            # Получаем список участников события
-            members_result = await session.execute(
-                select(EventMembers).where(EventMembers.event_id == event.id)
-            )
-            event_members = members_result.scalars().all()
-            
-            if event_members:
-                # Выбираем 1-5 участников для отзывов
-                num_comments = random.randint(1, min(5, len(event_members)))
-                selected_members = random.sample(event_members, num_comments)
-                
-                # Получаем шаблоны отзывов для типа события
-                comment_templates = COMMENT_TEMPLATES.get(event.type, COMMENT_TEMPLATES[EventType.MEETING])
-                
-                for member in selected_members:
-                    # Проверяем, не оставил ли уже этот пользователь отзыв
-                    check_result = await session.execute(
-                        select(EventComments).where(
-                            EventComments.event_id == event.id,
-                            EventComments.user_id == member.user_id
-                        )
-                    )
-                    if not check_result.scalar_one_or_none():
-                        # Выбираем случайный шаблон отзыва
-                        comment_template = random.choice(comment_templates)
-                        comment = EventComments(
-                            event_id=event.id,
-                            user_id=member.user_id,
-                            comment=comment_template["comment"],
-                            rating=comment_template["rating"]
-                        )
-                        session.add(comment)
-        
-        await session.commit()
-        events.append(event)
-    
-    return events
+
+    return len(new_events)
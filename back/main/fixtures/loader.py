@@ -1,14 +1,26 @@
+import hashlib
+import json
 import logging
 import os
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 
 from main.db.db import SessionLocal
-from main.fixtures.events import create_events_fixtures
-from main.fixtures.users import create_users_fixtures
+from main.fixtures.events import build_events_data, create_events_fixtures
+from main.fixtures.users import USERS_DATA, create_users_fixtures
+from main.models.fixtures import FixtureState
+from users.enums.user import UserRole
 
 logger = logging.getLogger(__name__)
 
+FIXTURES_NAME = "default"
+
+
+def fixtures_fingerprint(events_data: list[dict]) -> str:
+    content = json.dumps({"users": USERS_DATA, "events": events_data}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
 
 async def load_fixtures():
     """Загружает все фикстуры в базу данных"""
@@ -19,21 +31,36 @@ async def load_fixtures():
     if load_fixtures_env not in ("true", "1", "yes"):
         logger.info("Пропуск загрузки фикстур (LOAD_FIXTURES=false)")
         return
-    
-    logger.info("Начало загрузки фикстур...")
-    
+
+    regular_emails = [user["email"] for user in USERS_DATA if user["role"] == UserRole.USER]
+    events_data = build_events_data(regular_emails)
+    fingerprint = fixtures_fingerprint(events_data)
+
     async with SessionLocal() as session:
+        stored_fingerprint = await session.scalar(
+            select(FixtureState.fingerprint).where(FixtureState.name == FIXTURES_NAME)
+        )
+        if stored_fingerprint == fingerprint:
+            logger.info("Фикстуры не изменились, загрузка пропущена")
+            return
+
+        logger.info("Начало загрузки фикстур...")
         try:
-            # Создаем пользователей
-            logger.info("Создание пользователей...")
-            users = await create_users_fixtures(session)
-            logger.info(f"Создано/найдено {len(users)} пользователей")
-            
-            # Создаем события
-            logger.info("Создание событий...")
-            events = await create_events_fixtures(session, users)
-            logger.info(f"Создано/найдено {len(events)} событий")
-            
+            # Вся загрузка - одна транзакция: при ошибке отпечаток не сохранится
+            user_ids = await create_users_fixtures(session)
+            logger.info(f"Создано/найдено {len(user_ids)} пользователей")
+
+            created_events = await create_events_fixtures(session, events_data, user_ids)
+            logger.info(f"Создано {created_events} событий")
+
+            await session.execute(
+                insert(FixtureState)
+                .values(name=FIXTURES_NAME, fingerprint=fingerprint)
+                .on_conflict_do_update(
+                    index_elements=[FixtureState.name],
+                    set_={"fingerprint": fingerprint, "loaded_at": func.now()},
+                )
+            )
             await session.commit()
             logger.info("Фикстуры успешно загружены!")
             
@@ -41,4 +68,3 @@ async def load_fixtures():
             logger.error(f"Ошибка при загрузке фикстур: {e}", exc_info=True)
             await session.rollback()
             raise
-
@@ -6,10 +6,12 @@ from fastapi.responses import FileResponse
 
 from admin.routers import admin
 from events.routers import events
-from events.scheduler.events import scheduler
+from events.services.cache import events_cache_sync
 from main.config.settings import settings
 from main.db.db import init_db
 from notifications.routers import notifications
+from notifications.services.smtp import smtp_pool
+from notifications.services.templates import templates_cache
 from users.routers import auth
 
 logging.basicConfig(
@@ -20,8 +22,11 @@ logging.basicConfig(
 
 async def lifespan(app: FastAPI):
     await init_db()
-    scheduler.start()
+    templates_cache.load()
+    await events_cache_sync.start()
     yield
+    await events_cache_sync.stop()
+    await smtp_pool.close()
 
 app = FastAPI(lifespan=lifespan, root_path="/api")
 
@@ -7,6 +7,6 @@ Base = declarative_base()
 class BaseModel(Base):  # type: ignore[misc, valid-type]
     __abstract__ = True
 
-    id = Column(BigInteger, primary_key=True, index=True)
+    id = Column(BigInteger, primary_key=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, String, func
+
+from main.models.base import Base
+
+
+class FixtureState(Base):
+    __tablename__ = "fixture_state"
+
+    # Отпечаток содержимого последних загруженных фикстур
+    name = Column(String(64), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    loaded_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -7,3 +7,4 @@ class NotificationType(Enum):
     EVENT_REVIEW = "event_review"
     EVENT_CANCELLED = "event_cancelled"
     EVENT_REMINDER_24H = "event_reminder_24h"
+    EVENT_WAITLIST_PROMOTED = "event_waitlist_promoted"
@@ -0,0 +1,22 @@
+from enum import Enum
+
+
+class EmailKind(Enum):
+    VERIFICATION = "verification"
+    PASSWORD_RESET = "password_reset"
+    PASSWORD_RESET_SUCCESS = "password_reset_success"
+    WELCOME = "welcome"
+    EVENT_CREATED = "event_created"
+    EVENT_MEMBER_CANCELLED = "event_member_cancelled"
+    EVENT_MEMBER_CONFIRMED = "event_member_confirmed"
+    EVENT_REMINDER_24H = "event_reminder_24h"
+    EVENT_UPDATED = "event_updated"
+    EVENT_CANCELLED = "event_cancelled"
+    ADMIN_RESET_PASSWORD = "admin_reset_password"
+    EVENT_REVIEW = "event_review"
+
+
+class EmailOutboxStatus(Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
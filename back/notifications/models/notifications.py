@@ -1,4 +1,4 @@
-from sqlalchemy import BigInteger, Boolean, Column, Enum, ForeignKey
+from sqlalchemy import BigInteger, Boolean, Column, Enum, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 
 from main.models.base import BaseModel
@@ -7,6 +7,11 @@ from notifications.enums.notifications import NotificationType
 
 class Notification(BaseModel):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Список непрочитанных уведомлений пользователя, новые сверху
+        Index("idx_notification_user_unread_created_at", "user_id", "created_at", postgresql_where=text("is_read = false")),
+        Index("idx_notification_event_id", "event_id"),
+    )
 
     user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
     event_id = Column(BigInteger, ForeignKey("events.id"), nullable=False)
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, DateTime, Enum, Index, Integer, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from main.models.base import BaseModel
+from notifications.enums.outbox import EmailKind, EmailOutboxStatus
+
+
+class EmailOutbox(BaseModel):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Очередь воркера: только ожидающие письма в порядке готовности
+        Index(
+            "idx_email_outbox_pending_next_attempt_at", "next_attempt_at", "id",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+        # Очистка по сроку хранения: только доставленные и мёртвые письма
+        Index(
+            "idx_email_outbox_done_updated_at", "updated_at",
+            postgresql_where=text("status IN ('SENT', 'DEAD')"),
+        ),
+    )
+
+    email = Column(String(128), nullable=False)
+    kind = Column(Enum(EmailKind), nullable=False)
+    # Аргументы EmailService.render_<kind>_email
+    payload = Column(JSONB, nullable=False)
+    status = Column(Enum(EmailOutboxStatus), nullable=False, default=EmailOutboxStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=func.now())
+    last_error = Column(String(1024), nullable=True)
+    sent_at = Column(DateTime, nullable=True)
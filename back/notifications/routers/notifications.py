@@ -1,8 +1,9 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
 from main.db.db import SessionDependency
+from main.http.etag import etag_matches, make_etag, not_modified
 from notifications.schemas.responses import NotificationResponse
 from notifications.services.notifications import NotificationsService
 from users.dependencies.users import user_dependency
@@ -14,8 +15,16 @@ router = APIRouter()
 @router.get("/notifications", response_model=List[NotificationResponse])
 async def get_notifications_request(
     session: SessionDependency,
+    request: Request,
+    response: Response,
     user: User = Depends(user_dependency)
 ):
+    version = await NotificationsService.get_notifications_version(session=session, user_id=user.id)
+    etag = make_etag(user.id, *version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     notifications = await NotificationsService.get_notifications(session=session, user_id=user.id)
     notifications_response = [NotificationResponse.model_validate({
         "id": notification.id,
@@ -1,82 +1,96 @@
+import asyncio
 import logging
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Optional
-
-import aiosmtplib
+from email.policy import SMTP
+from typing import List, Optional, Tuple
 
 from main.config.settings import settings
+from notifications.services.smtp import smtp_pool
 from notifications.services.templates import TemplatesService
 
 logger = logging.getLogger(__name__)
 
 
 class EmailService:
+    """Отправка писем. render_*_email собирают тему и HTML письма из аргументов,
+    send_bulk_email рассылает готовое письмо списку адресатов.
+    """
+
+    @staticmethod
+    def build_message(subject: str, html_body: Optional[str] = None) -> bytes:
+        # Письмо без To: заголовки и закодированное тело общие для всех адресатов
+        message = MIMEMultipart('alternative', policy=SMTP)
+        message['From'] = f"{settings.SMTP_FROM_NAME} <{settings.SMTP_FROM_EMAIL}>"
+        message['Subject'] = subject
+        message.attach(MIMEText(html_body or "", 'html', 'utf-8', policy=SMTP))
+        return message.as_bytes()
+
+    @staticmethod
+    async def send_bulk_email(
+        emails: List[str],
+        subject: str,
+        html_body: Optional[str] = None
+    ) -> List[bool]:
+        # Шаблон рендерится и MIME кодируется один раз на рассылку, каждому адресату
+        # дописывается только заголовок To. Байты письма на адресата собираются прямо
+        # перед отправкой, поэтому в памяти их не больше, чем соединений в пуле
+        message = EmailService.build_message(subject, html_body)
+        results = [False] * len(emails)
+        pending = iter(enumerate(emails))
+
+        async def sender():
+            for index, email in pending:
+                try:
+                    await smtp_pool.sendmail(
+                        settings.SMTP_FROM_EMAIL, email, b"To: " + email.encode() + b"\r\n" + message
+                    )
+                    results[index] = True
+                except Exception as e:
+                    logger.error(f"Unexpected error sending email to {email}: {e}", exc_info=True)
+
+        await asyncio.gather(*(sender() for _ in range(min(len(emails), smtp_pool.size))))
+        logger.info(f"Email \"{subject}\" sent to {sum(results)} of {len(emails)} recipients")
+        return results
+
     @staticmethod
     async def send_email(
         email: str,
         subject: str,
         html_body: Optional[str] = None
     ) -> bool:
-
-        try:
-            message = MIMEMultipart('alternative')
-            message['From'] = f"{settings.SMTP_FROM_NAME} <{settings.SMTP_FROM_EMAIL}>"
-            message['To'] = email
-            message['Subject'] = subject
-
-            if html_body is None:
-                html_body = ""
-            html_part = MIMEText(html_body, 'html', 'utf-8')
-            message.attach(html_part)
-
-            smtp = aiosmtplib.SMTP(
-                hostname=settings.SMTP_HOST,
-                port=settings.SMTP_PORT,
-                use_tls=False,
-                start_tls=True,
-            )
-            await smtp.connect()
-            await smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            await smtp.send_message(message)
-            await smtp.quit()
-
-            logger.info(f"Email successfully sent to {email}")
-            return True
-        except Exception as e:
-            logger.error(f"Unexpected error sending email: {e}", exc_info=True)
-            return False
+        results = await EmailService.send_bulk_email([email], subject, html_body)
+        return results[0]
 
     @staticmethod
-    async def send_verification_email(email: str, verification_code: str) -> bool:
+    async def render_verification_email(verification_code: str) -> Tuple[str, str]:
 
         subject = "Подтверждение регистрации"
         verification_url = f"{settings.APP_URL}{settings.VERIFICATION_URL}?code={verification_code}"
         html_body = await TemplatesService.get_verification_email_html(verification_code, verification_url)
-        return await EmailService.send_email(email, subject, html_body)
+        return subject, html_body
 
     @staticmethod
-    async def send_password_reset_email(email: str, reset_token: str) -> bool:
+    async def render_password_reset_email(reset_token: str) -> Tuple[str, str]:
         reset_url = f"{settings.APP_URL}{settings.RESET_URL}?token={reset_token}"
         subject = "Сброс пароля"
         html_body = await TemplatesService.get_password_reset_email_html(reset_url)
-        return await EmailService.send_email(email, subject, html_body)
+        return subject, html_body
 
     @staticmethod
-    async def send_password_reset_success_email(email: str) -> bool:
+    async def render_password_reset_success_email() -> Tuple[str, str]:
         subject = "Сброс пароля успешно выполнен"
         html_body = await TemplatesService.get_password_reset_success_email_html()
-        return await EmailService.send_email(email, subject, html_body)
+        return subject, html_body
 
     @staticmethod
-    async def send_welcome_email(email: str) -> bool:
+    async def render_welcome_email() -> Tuple[str, str]:
         subject = f"Добро пожаловать в {settings.SMTP_FROM_NAME}"
         html_body = await TemplatesService.get_welcome_email_html()
-        return await EmailService.send_email(email, subject, html_body)
+        return subject, html_body
 
     @staticmethod
-    async def send_event_created_email(
-        email: str,
+    async def render_event_created_email(
         event_name: str,
         event_date: str,
         event_time: str,
@@ -84,7 +98,7 @@ class EmailService:
         max_participants: int | str,
         event_description: str,
         event_url: str
-    ) -> bool:
+    ) -> Tuple[str, str]:
         subject = "Событие создано"
         html_body = await TemplatesService.get_event_created_email_html(
             event_name,
@@ -95,11 +109,10 @@ class EmailService:
             event_description,
             event_url
         )
-        return await EmailService.send_email(email, subject, html_body)
+        return subject, html_body
 
     @staticmethod
-    async def send_event_member_cancelled_email(
-        email: str,
+    async def render_event_member_cancelled_email(
         event_name: str,
         event_date: str,
         event_time: str,
@@ -107,7 +120,7 @@ class EmailService:
         member_name: str,
         new_members_count: int,
         event_url: str
-    ) -> bool:
+    ) -> Tuple[str, str]:
         subject = "Участник отменил участие в событии"
         html_body = await TemplatesService.get_event_member_cancelled_email_html(
             event_name=event_name,
@@ -118,11 +131,10 @@ class EmailService:
             members_count=new_members_count,
             event_url=event_url
         )
-        return await EmailService.send_email(email, subject, html_body)
+        return subject, html_body
 
     @staticmethod
-    async def send_event_member_confirmed_email(
-        email: str,
+    async def render_event_member_confirmed_email(
         event_name: str,
         event_date: str,
         event_time: str,
@@ -130,7 +142,7 @@ class EmailService:
         member_name: str,
         new_members_count: int,
         event_url: str
-    ) -> bool:
+    ) -> Tuple[str, str]:
         subject = "Участник подтвердил участие в событии"
         html_body = await TemplatesService.get_event_member_confirmed_email_html(
             event_name=event_name,
@@ -141,18 +153,17 @@ class EmailService:
             members_count=new_members_count,
             event_url=event_url
         )
-        return await EmailService.send_email(email, subject, html_body)
+        return subject, html_body
 
     @staticmethod
-    async def send_event_reminder_24h_email(
-        email: str,
+    async def render_event_reminder_24h_email(
         event_name: str,
         event_date: str,
         event_time: str,
         event_location: str,
         members_count: int,
         event_url: str
-    ) -> bool:
+    ) -> Tuple[str, str]:
         subject = "Напоминание о событии"
         html_body = await TemplatesService.get_event_reminder_24h_email_html(
             event_name=event_name,
@@ -162,11 +173,10 @@ class EmailService:
             members_count=members_count,
             event_url=event_url
         )
-        return await EmailService.send_email(email, subject, html_body)
+        return subject, html_body
 
     @staticmethod
-    async def send_event_updated_email(
-        email: str,
+    async def render_event_updated_email(
         event_name: str,
         old_date: str | None,
         new_date: str | None,
@@ -174,7 +184,7 @@ class EmailService:
         new_location: str | None,
         new_description: str | None,
         event_url: str
-    ) -> bool:
+    ) -> Tuple[str, str]:
         subject = "Изменения в событии"
         html_body = await TemplatesService.get_event_updated_email_html(
             event_name=event_name,
@@ -185,16 +195,15 @@ class EmailService:
             new_description=new_description,
             event_url=event_url
         )
-        return await EmailService.send_email(email, subject, html_body)
+        return subject, html_body
 
     @staticmethod
-    async def send_event_cancelled_email(
-        email: str,
+    async def render_event_cancelled_email(
         event_name: str,
         event_date: str,
         event_location: str,
         event_url: str
-    ) -> bool:
+    ) -> Tuple[str, str]:
         subject = "Событие отменено"
         html_body = await TemplatesService.get_event_cancelled_email_html(
             event_name=event_name,
@@ -202,29 +211,27 @@ class EmailService:
             event_location=event_location,
             event_url=event_url
         )
-        return await EmailService.send_email(email, subject, html_body)
+        return subject, html_body
 
     @staticmethod
-    async def send_admin_reset_password_email(
-        email: str,
+    async def render_admin_reset_password_email(
         new_password: str
-    ) -> bool:
+    ) -> Tuple[str, str]:
         subject = "Сброс пароля"
         html_body = await TemplatesService.get_admin_reset_password_email_html(
             new_password=new_password,
             login_url=f"{settings.APP_URL}{settings.LOGIN_URL}"
         )
-        return await EmailService.send_email(email, subject, html_body)
+        return subject, html_body
 
     @staticmethod
-    async def send_event_review_email(
-        email: str,
+    async def render_event_review_email(
         event_name: str,
         event_date: str,
         event_time: str,
         event_location: str,
         event_url: str
-    ) -> bool:
+    ) -> Tuple[str, str]:
         subject = "Оценка события"
         html_body = await TemplatesService.get_event_review_email_html(
             event_name=event_name,
@@ -233,4 +240,4 @@ class EmailService:
             event_location=event_location,
             event_url=event_url
         )
-        return await EmailService.send_email(email, subject, html_body)
+        return subject, html_body
@@ -1,10 +1,12 @@
 from typing import List
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import BigInteger, any_, bindparam, false, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from events.models.events import Event, EventMembers
 from notifications.enums.notifications import NotificationType
 from notifications.models.notifications import Notification
 
@@ -21,6 +23,48 @@ class NotificationsService:
         await session.flush()
         return notification
 
+    @staticmethod
+    async def create_notifications_bulk(session: AsyncSession, user_ids: List[int], event_id: int, type: NotificationType) -> int:
+        # Рассылка одним INSERT ... SELECT unnest(:user_ids): получатели передаются одним
+        # параметром-массивом, поэтому запрос не упирается в лимит параметров при тысячах строк
+        if not user_ids:
+            return 0
+        result = await session.execute(
+            insert(Notification).from_select(
+                ["user_id", "event_id", "type", "is_read", "created_at", "updated_at"],
+                select(
+                    func.unnest(bindparam("user_ids", list(user_ids), type_=ARRAY(BigInteger))),
+                    literal(event_id, BigInteger),
+                    literal(type, Notification.__table__.c.type.type),
+                    false(),
+                    func.now(),
+                    func.now(),
+                ),
+            )
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def create_notifications_for_members(session: AsyncSession, event_ids: List[int], type: NotificationType) -> int:
+        # Уведомление всем участникам перечисленных событий одним INSERT ... SELECT из event_members,
+        # без выгрузки списков участников в приложение
+        if not event_ids:
+            return 0
+        result = await session.execute(
+            insert(Notification).from_select(
+                ["user_id", "event_id", "type", "is_read", "created_at", "updated_at"],
+                select(
+                    EventMembers.user_id,
+                    EventMembers.event_id,
+                    literal(type, Notification.__table__.c.type.type),
+                    false(),
+                    func.now(),
+                    func.now(),
+                ).where(EventMembers.event_id == any_(bindparam("event_ids", list(event_ids), type_=ARRAY(BigInteger)))),
+            )
+        )
+        return result.rowcount
+
     @staticmethod
     async def get_notifications(session: AsyncSession, user_id: int, is_read: bool = False) -> List[Notification]:
         result = await session.execute(
@@ -31,6 +75,22 @@ class NotificationsService:
         )
         return result.scalars().all()
 
+    @staticmethod
+    async def get_notifications_version(session: AsyncSession, user_id: int, is_read: bool = False) -> tuple:
+        # Агрегатный отпечаток списка: новое уведомление меняет max(id), прочтение - count,
+        # переименование события - max(events.updated_at)
+        result = await session.execute(
+            select(
+                func.count(Notification.id),
+                func.max(Notification.id),
+                func.max(Notification.updated_at),
+                func.max(Event.updated_at),
+            )
+            .join(Event, Event.id == Notification.event_id)
+            .where(Notification.user_id == user_id, Notification.is_read == is_read)
+        )
+        return tuple(result.one())
+
     @staticmethod
     async def get_notification_by_id(session: AsyncSession, notification_id: int) -> Notification:
         result = await session.execute(
@@ -0,0 +1,184 @@
+from typing import List
+
+from sqlalchemy import BigInteger, Select, String, Text, any_, bindparam, case, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from events.models.events import EventMembers
+from main.config.settings import settings
+from notifications.enums.outbox import EmailKind, EmailOutboxStatus
+from notifications.models.outbox import EmailOutbox
+from users.enums.user import UserRole
+from users.models.user import User
+
+
+# Ключи payload с кодами, токенами и паролями: удаляются, как только письмо больше не будет отправляться
+SECRET_PAYLOAD_KEYS = ("verification_code", "reset_token", "new_password")
+
+
+class OutboxService:
+    """Исходящие письма: запись в транзакции вызывающего кода, доставка - notifications.worker.outbox.
+
+    enqueue* только добавляют строки в текущую сессию и не коммитят: письмо уходит
+    тогда и только тогда, когда фиксируется изменение, ради которого оно написано.
+    """
+
+    @staticmethod
+    def enqueue(session: AsyncSession, email: str, kind: EmailKind, **payload) -> None:
+        session.add(EmailOutbox(email=email, kind=kind, payload=payload))
+
+    @staticmethod
+    async def _enqueue_from(session: AsyncSession, emails: Select, kind: EmailKind, payload: dict) -> int:
+        result = await session.execute(
+            insert(EmailOutbox).from_select(
+                ["email", "kind", "payload"],
+                select(
+                    emails.subquery().c.email,
+                    literal(kind, EmailOutbox.__table__.c.kind.type),
+                    literal(payload, JSONB),
+                ),
+            )
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def enqueue_many(session: AsyncSession, emails: List[str], kind: EmailKind, **payload) -> int:
+        # Рассылка с общими аргументами одним INSERT ... SELECT unnest(:emails)
+        if not emails:
+            return 0
+        recipients = select(
+            func.unnest(bindparam("emails", list(emails), type_=ARRAY(String))).label("email")
+        )
+        return await OutboxService._enqueue_from(session, recipients, kind, payload)
+
+    @staticmethod
+    async def enqueue_for_users(session: AsyncSession, user_ids: List[int], kind: EmailKind, **payload) -> int:
+        if not user_ids:
+            return 0
+        recipients = select(User.email.label("email")).where(
+            User.id == any_(bindparam("user_ids", list(user_ids), type_=ARRAY(BigInteger)))
+        )
+        return await OutboxService._enqueue_from(session, recipients, kind, payload)
+
+    @staticmethod
+    async def enqueue_for_admins(session: AsyncSession, kind: EmailKind, **payload) -> int:
+        recipients = select(User.email.label("email")).where(User.role == UserRole.ADMIN)
+        return await OutboxService._enqueue_from(session, recipients, kind, payload)
+
+    @staticmethod
+    async def enqueue_for_members(session: AsyncSession, event_id: int, kind: EmailKind, **payload) -> int:
+        recipients = (
+            select(User.email.label("email"))
+            .join(EventMembers, EventMembers.user_id == User.id)
+            .where(EventMembers.event_id == event_id)
+        )
+        return await OutboxService._enqueue_from(session, recipients, kind, payload)
+
+    @staticmethod
+    async def claim(session: AsyncSession, batch_size: int) -> List[EmailOutbox]:
+        # Захват пачки: строки, заблокированные другим воркером, пропускаются (SKIP LOCKED).
+        # Попытка засчитывается сразу, а next_attempt_at сдвигается на срок аренды: если воркер
+        # упадёт посреди отправки, письма снова станут доступны после её истечения
+        ready = (
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status == EmailOutboxStatus.PENDING, EmailOutbox.next_attempt_at <= func.now())
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(ready.scalar_subquery()))
+            .values(
+                attempts=EmailOutbox.attempts + 1,
+                next_attempt_at=func.now() + func.make_interval(0, 0, 0, 0, 0, 0, settings.EMAIL_OUTBOX_LEASE_SECONDS),
+            )
+            .returning(EmailOutbox)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = list(result.scalars().all())
+        await session.commit()
+        return claimed
+
+    @staticmethod
+    async def mark_sent(session: AsyncSession, ids: List[int]) -> None:
+        # В payload бывают коды, токены и пароли: после доставки он больше не нужен
+        if not ids:
+            return
+        await session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == any_(bindparam("ids", ids, type_=ARRAY(BigInteger))))
+            .values(status=EmailOutboxStatus.SENT, sent_at=func.now(), last_error=None, payload={})
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+    @staticmethod
+    async def cancel_for_event(session: AsyncSession, event_id: int) -> int:
+        # Неотправленные письма об удаляемом событии: у всех событийных писем в payload есть
+        # event_url. Не коммитит - удаляются в транзакции удаления события
+        event_url = f"{settings.APP_URL}{settings.EVENT_DETAIL_URL.format(event_id=event_id)}"
+        result = await session.execute(
+            delete(EmailOutbox)
+            .where(
+                EmailOutbox.status == EmailOutboxStatus.PENDING,
+                EmailOutbox.payload["event_url"].astext == event_url,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def purge(session: AsyncSession, retention_days: int, batch_size: int) -> int:
+        # Доставленные и мёртвые письма старше срока хранения удаляются пачками,
+        # чтобы не держать долгих блокировок; возвращает число удалённых строк
+        expired = (
+            select(EmailOutbox.id)
+            .where(
+                EmailOutbox.status.in_([EmailOutboxStatus.SENT, EmailOutboxStatus.DEAD]),
+                EmailOutbox.updated_at < func.now() - func.make_interval(0, 0, 0, retention_days),
+            )
+            .limit(batch_size)
+        )
+        deleted = 0
+        while True:
+            result = await session.execute(
+                delete(EmailOutbox)
+                .where(EmailOutbox.id.in_(expired.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
+
+    @staticmethod
+    async def mark_failed(session: AsyncSession, ids: List[int], error: str) -> None:
+        # Повтор через base * 2^(attempts - 1) секунд, не дольше max; после последней попытки - DEAD.
+        # У мёртвых писем остальной payload остаётся для разбора, а секреты вычищаются
+        if not ids:
+            return
+        status_type = EmailOutbox.__table__.c.status.type
+        is_dead = EmailOutbox.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        redacted = EmailOutbox.payload.op("-", return_type=JSONB)(
+            bindparam("secret_keys", list(SECRET_PAYLOAD_KEYS), type_=ARRAY(Text))
+        )
+        delay = func.least(
+            settings.EMAIL_OUTBOX_BACKOFF_BASE_SECONDS * func.power(2, EmailOutbox.attempts - 1),
+            settings.EMAIL_OUTBOX_BACKOFF_MAX_SECONDS,
+        )
+        await session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == any_(bindparam("ids", ids, type_=ARRAY(BigInteger))))
+            .values(
+                status=case(
+                    (is_dead, literal(EmailOutboxStatus.DEAD, status_type)),
+                    else_=literal(EmailOutboxStatus.PENDING, status_type),
+                ),
+                payload=case((is_dead, redacted), else_=EmailOutbox.payload),
+                next_attempt_at=func.now() + func.make_interval(0, 0, 0, 0, 0, 0, delay),
+                last_error=error[:1024],
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from email.message import Message
+from typing import Awaitable, Callable, Optional
+
+import aiosmtplib
+
+from main.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledConnection:
+    smtp: aiosmtplib.SMTP
+    last_used_at: float = field(default_factory=time.monotonic)
+    messages_sent: int = 0
+
+
+class SmtpPool:
+    """Пул постоянных SMTP-соединений.
+
+    Соединение открывается (STARTTLS + LOGIN) один раз и несёт много писем. Одновременно
+    открыто не больше size соединений, простаивающие дольше idle_timeout закрываются,
+    а перед повторным использованием давно простаивавшего соединения выполняется NOOP.
+    Обрыв переиспользованного соединения во время отправки - повтор на новом.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        size: int = 5,
+        idle_timeout: float = 60,
+        health_check_after: float = 15,
+        max_messages: int = 100,
+        timeout: float = 30,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self.connects = 0
+        self.reconnects = 0
+        self.messages = 0
+        # Стек: последним вернули - первым выдадим, реже всего приходится проверять NOOP
+        self._idle: list[PooledConnection] = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def _connect(self) -> PooledConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=False,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        await smtp.connect()
+        if self.username:
+            await smtp.login(self.username, self.password)
+        self.connects += 1
+        return PooledConnection(smtp=smtp)
+
+    @staticmethod
+    async def _close(connection: PooledConnection) -> None:
+        try:
+            await connection.smtp.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            connection.smtp.close()
+
+    async def _checkout(self) -> tuple[PooledConnection, bool]:
+        # Возвращает соединение и признак того, что оно уже использовалось
+        while self._idle:
+            connection = self._idle.pop()
+            idle_for = time.monotonic() - connection.last_used_at
+            if idle_for > self.idle_timeout or not connection.smtp.is_connected:
+                await self._close(connection)
+                continue
+            if idle_for > self.health_check_after:
+                try:
+                    await connection.smtp.noop()
+                except (aiosmtplib.SMTPException, OSError):
+                    connection.smtp.close()
+                    continue
+            return connection, True
+        return await self._connect(), False
+
+    async def _checkin(self, connection: PooledConnection) -> None:
+        connection.last_used_at = time.monotonic()
+        if connection.messages_sent >= self.max_messages or not connection.smtp.is_connected:
+            await self._close(connection)
+        else:
+            self._idle.append(connection)
+
+    async def _send(self, send: Callable[[aiosmtplib.SMTP], Awaitable]) -> None:
+        async with self._semaphore:
+            connection, reused = await self._checkout()
+            while True:
+                try:
+                    await send(connection.smtp)
+                except OSError:
+                    # Обрывы и таймауты aiosmtplib - наследники OSError. Сервер мог закрыть
+                    # давно открытое соединение: один повтор на свежем, свежее не повторяем
+                    connection.smtp.close()
+                    if not reused:
+                        raise
+                    logger.info(f"SMTP connection to {self.hostname} lost, reconnecting")
+                    self.reconnects += 1
+                    connection, reused = await self._connect(), False
+                    continue
+                except aiosmtplib.SMTPException:
+                    # Отказ по конкретному письму (адресат, размер) соединение не портит
+                    await self._checkin(connection)
+                    raise
+                break
+            connection.messages_sent += 1
+            self.messages += 1
+            await self._checkin(connection)
+
+    async def send_message(self, message: Message) -> None:
+        await self._send(lambda smtp: smtp.send_message(message))
+
+    async def sendmail(self, sender: str, recipient: str, message: bytes) -> None:
+        # Уже закодированное письмо, без повторной сериализации MIME
+        await self._send(lambda smtp: smtp.sendmail(sender, [recipient], message))
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await self._close(connection)
+
+
+smtp_pool = SmtpPool(
+    hostname=settings.SMTP_HOST,
+    port=settings.SMTP_PORT,
+    username=settings.SMTP_USER,
+    password=settings.SMTP_PASSWORD,
+    start_tls=settings.SMTP_START_TLS,
+    size=settings.SMTP_POOL_SIZE,
+    idle_timeout=settings.SMTP_POOL_IDLE_TIMEOUT_SECONDS,
+    health_check_after=settings.SMTP_POOL_HEALTH_CHECK_SECONDS,
+    max_messages=settings.SMTP_POOL_MAX_MESSAGES,
+    timeout=settings.SMTP_TIMEOUT_SECONDS,
+)
@@ -1,28 +1,103 @@
+import logging
 from pathlib import Path
 from string import Template
-
-import aiofiles  # type: ignore[import-untyped]
+from typing import Dict, List
 
 from main.config.settings import settings
 
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
+
+
+class CompiledTemplate:
+    """string.Template, разобранный заранее на литералы и имена подстановок.
+
+    Синтаксис и ошибки те же ($name, ${name}, $$, KeyError на отсутствующий ключ),
+    но рендер - один join без прохода регулярным выражением по всему тексту.
+    """
+
+    __slots__ = ("parts",)
+
+    def __init__(self, source: str):
+        # Чётные элементы - литералы, нечётные - имена подстановок
+        parts: List[str] = []
+        literal: List[str] = []
+        position = 0
+        for match in Template.pattern.finditer(source):
+            literal.append(source[position:match.start()])
+            position = match.end()
+            if match.group("escaped") is not None:
+                literal.append(Template.delimiter)
+                continue
+            name = match.group("named") or match.group("braced")
+            if name is None:
+                raise ValueError(f"Invalid placeholder at position {match.start()}")
+            parts.append("".join(literal))
+            parts.append(name)
+            literal = []
+        literal.append(source[position:])
+        parts.append("".join(literal))
+        self.parts = parts
+
+    def substitute(self, **values) -> str:
+        parts = self.parts
+        rendered = [parts[0]]
+        for index in range(1, len(parts), 2):
+            rendered.append(str(values[parts[index]]))
+            rendered.append(parts[index + 1])
+        return "".join(rendered)
 
-class TemplatesService:
-    @staticmethod
-    def get_template_path(template_name: str) -> Path:
-        current_file = Path(__file__)
-        templates_dir = current_file.parent.parent / "templates"
-        return templates_dir / template_name
 
+class TemplatesCache:
+    """Скомпилированные шаблоны писем в памяти процесса.
+
+    load() читает все *.html из каталога шаблонов один раз (при старте API и воркера),
+    после этого рендер не обращается к диску. С reload=True (для разработки) перед
+    выдачей шаблона сверяется mtime файла и изменённый шаблон перечитывается.
+    """
+
+    def __init__(self, templates_dir: Path, reload: bool = False):
+        self.templates_dir = templates_dir
+        self.reload = reload
+        self._templates: Dict[str, CompiledTemplate] = {}
+        self._mtimes: Dict[str, int] = {}
+
+    def _compile(self, name: str) -> CompiledTemplate:
+        path = self.templates_dir / name
+        self._mtimes[name] = path.stat().st_mtime_ns
+        template = CompiledTemplate(path.read_text(encoding="utf-8"))
+        self._templates[name] = template
+        return template
+
+    def load(self) -> int:
+        for path in sorted(self.templates_dir.rglob("*.html")):
+            self._compile(path.relative_to(self.templates_dir).as_posix())
+        logger.info(f"Loaded {len(self._templates)} email templates from {self.templates_dir}")
+        return len(self._templates)
+
+    def get(self, name: str) -> CompiledTemplate:
+        template = self._templates.get(name)
+        if template is None:
+            # Шаблон вне предзагрузки (или load() ещё не вызывался) - читаем один раз
+            return self._compile(name)
+        if self.reload and (self.templates_dir / name).stat().st_mtime_ns != self._mtimes[name]:
+            logger.info(f"Email template {name} changed, reloading")
+            return self._compile(name)
+        return template
+
+
+templates_cache = TemplatesCache(TEMPLATES_DIR, reload=settings.EMAIL_TEMPLATES_RELOAD)
+
+
+class TemplatesService:
     @staticmethod
-    async def load_template(template_name: str) -> str:
-        template_path = TemplatesService.get_template_path(template_name)
-        async with aiofiles.open(template_path, "r", encoding="utf-8") as f:
-            return await f.read()
+    def get_template(template_name: str) -> CompiledTemplate:
+        return templates_cache.get(template_name)
 
     @staticmethod
     async def get_verification_email_html(verification_code: str, verification_url: str) -> str:
-        template_content = await TemplatesService.load_template("verification.html")
-        template = Template(template_content)
+        template = TemplatesService.get_template("verification.html")
         return template.substitute(
             verification_code=verification_code,
             verification_url=verification_url
@@ -30,20 +105,17 @@ class TemplatesService:
 
     @staticmethod
     async def get_password_reset_email_html(reset_url: str) -> str:
-        template_content = await TemplatesService.load_template("password-reset.html")
-        template = Template(template_content)
+        template = TemplatesService.get_template("password-reset.html")
         return template.substitute(reset_url=reset_url)
 
     @staticmethod
     async def get_password_reset_success_email_html() -> str:
-        template_content = await TemplatesService.load_template("password-reset-success.html")
-        template = Template(template_content)
+        template = TemplatesService.get_template("password-reset-success.html")
         return template.substitute(app_url=settings.APP_URL)
 
     @staticmethod
     async def get_welcome_email_html() -> str:
-        template_content = await TemplatesService.load_template("welcome.html")
-        template = Template(template_content)
+        template = TemplatesService.get_template("welcome.html")
         return template.substitute(app_url=settings.APP_URL)
 
     @staticmethod
@@ -56,8 +128,7 @@ class TemplatesService:
         event_description: str,
         event_url: str
     ) -> str:
-        template_content = await TemplatesService.load_template("event-created.html")
-        template = Template(template_content)
+        template = TemplatesService.get_template("event-created.html")
         return template.substitute(
             event_name=event_name,
             event_date=event_date,
@@ -78,8 +149,7 @@ class TemplatesService:
         members_count: int,
         event_url: str
     ) -> str:
-        template_content = await TemplatesService.load_template("event-member-cancelled.html")
-        template = Template(template_content)
+        template = TemplatesService.get_template("event-member-cancelled.html")
         return template.substitute(
             event_name=event_name,
             event_date=event_date,
@@ -100,8 +170,7 @@ class TemplatesService:
         members_count: int,
         event_url: str
     ) -> str:
-        template_content = await TemplatesService.load_template("event-member-confirmed.html")
-        template = Template(template_content)
+        template = TemplatesService.get_template("event-member-confirmed.html")
         return template.substitute(
             event_name=event_name,
             event_date=event_date,
@@ -121,8 +190,7 @@ class TemplatesService:
         members_count: int,
         event_url: str
     ) -> str:
-        template_content = await TemplatesService.load_template("event-reminder-24h.html")
-        template = Template(template_content)
+        template = TemplatesService.get_template("event-reminder-24h.html")
         return template.substitute(
             event_name=event_name,
             event_date=event_date,
@@ -144,8 +212,7 @@ class TemplatesService:
     ) -> str:
         change_items_html = ""
         if old_date and new_date:
-            change_item_html = await TemplatesService.load_template("updated/event-updated-date.html")
-            change_item_html = Template(change_item_html).substitute(
+            change_item_html = TemplatesService.get_template("updated/event-updated-date.html").substitute(
                 event_name=event_name,
                 old_date=old_date,
                 new_date=new_date,
@@ -153,8 +220,7 @@ class TemplatesService:
             )
             change_items_html += change_item_html
         if old_location and new_location:
-            change_item_html = await TemplatesService.load_template("updated/event-updated-place.html")
-            change_item_html = Template(change_item_html).substitute(
+            change_item_html = TemplatesService.get_template("updated/event-updated-place.html").substitute(
                 event_name=event_name,
                 old_location=old_location,
                 new_location=new_location,
@@ -162,16 +228,14 @@ class TemplatesService:
             )
             change_items_html += change_item_html
         if new_description:
-            change_item_html = await TemplatesService.load_template("updated/event-updated-desc.html")
-            change_item_html = Template(change_item_html).substitute(
+            change_item_html = TemplatesService.get_template("updated/event-updated-desc.html").substitute(
                 event_name=event_name,
                 new_description=new_description,
                 event_url=event_url
             )
             change_items_html += change_item_html
 
-        template_content = await TemplatesService.load_template("updated/event-updated.html")
-        template = Template(template_content)
+        template = TemplatesService.get_template("updated/event-updated.html")
         return template.substitute(
             event_name=event_name,
             change_items_html=change_items_html,
@@ -185,8 +249,7 @@ class TemplatesService:
         event_location: str,
         event_url: str
     ) -> str:
-        template_content = await TemplatesService.load_template("event-cancelled.html")
-        template = Template(template_content)
+        template = TemplatesService.get_template("event-cancelled.html")
         return template.substitute(
             event_name=event_name,
             event_date=event_date,
@@ -199,8 +262,7 @@ class TemplatesService:
         new_password: str,
         login_url: str
     ) -> str:
-        template_content = await TemplatesService.load_template("admin-password-reset.html")
-        template = Template(template_content)
+        template = TemplatesService.get_template("admin-password-reset.html")
         return template.substitute(
             new_password=new_password,
             login_url=login_url
@@ -214,8 +276,7 @@ class TemplatesService:
         event_location: str,
         event_url: str
     ) -> str:
-        template_content = await TemplatesService.load_template("event-review.html")
-        template = Template(template_content)
+        template = TemplatesService.get_template("event-review.html")
         return template.substitute(
             event_name=event_name,
             event_date=event_date,
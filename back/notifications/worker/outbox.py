@@ -0,0 +1,142 @@
+"""Воркер доставки писем из email_outbox. Запускается отдельным процессом:
+
+    python -m notifications.worker.outbox
+
+Забирает готовые письма пачками по EMAIL_OUTBOX_BATCH_SIZE (FOR UPDATE SKIP LOCKED,
+можно запускать несколько экземпляров), отправляет их через пул SMTP-соединений и
+отмечает результат. Неудачные письма повторяются с экспоненциальной задержкой, после
+EMAIL_OUTBOX_MAX_ATTEMPTS попыток переходят в DEAD. Раз в EMAIL_OUTBOX_PURGE_INTERVAL_SECONDS
+удаляет доставленные и мёртвые письма старше EMAIL_OUTBOX_RETENTION_DAYS.
+"""
+import asyncio
+import json
+import logging
+import signal
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from main.config.settings import settings
+from main.db.db import SessionLocal, engine, init_db
+from notifications.enums.outbox import EmailKind
+from notifications.models.outbox import EmailOutbox
+from notifications.services.email import EmailService
+from notifications.services.outbox import OutboxService
+from notifications.services.smtp import smtp_pool
+from notifications.services.templates import templates_cache
+
+logger = logging.getLogger(__name__)
+
+EMAIL_RENDERERS: Dict[EmailKind, Callable[..., Awaitable[Tuple[str, str]]]] = {
+    EmailKind.VERIFICATION: EmailService.render_verification_email,
+    EmailKind.PASSWORD_RESET: EmailService.render_password_reset_email,
+    EmailKind.PASSWORD_RESET_SUCCESS: EmailService.render_password_reset_success_email,
+    EmailKind.WELCOME: EmailService.render_welcome_email,
+    EmailKind.EVENT_CREATED: EmailService.render_event_created_email,
+    EmailKind.EVENT_MEMBER_CANCELLED: EmailService.render_event_member_cancelled_email,
+    EmailKind.EVENT_MEMBER_CONFIRMED: EmailService.render_event_member_confirmed_email,
+    EmailKind.EVENT_REMINDER_24H: EmailService.render_event_reminder_24h_email,
+    EmailKind.EVENT_UPDATED: EmailService.render_event_updated_email,
+    EmailKind.EVENT_CANCELLED: EmailService.render_event_cancelled_email,
+    EmailKind.ADMIN_RESET_PASSWORD: EmailService.render_admin_reset_password_email,
+    EmailKind.EVENT_REVIEW: EmailService.render_event_review_email,
+}
+
+
+async def deliver(messages: List[EmailOutbox]) -> List[Optional[str]]:
+    # Письма одного вида с одинаковыми аргументами: рендер один раз, рассылка списком.
+    # Результат по письмам: None - доставлено, иначе текст ошибки для last_error
+    kind, payload = messages[0].kind, messages[0].payload
+    try:
+        subject, html_body = await EMAIL_RENDERERS[kind](**payload)
+    except Exception as e:
+        logger.error(f"Failed to render {kind.value} email: {e}", exc_info=True)
+        return [f"{type(e).__name__}: {e}"] * len(messages)
+    results = await EmailService.send_bulk_email([message.email for message in messages], subject, html_body)
+    return [None if sent else "SMTP delivery failed" for sent in results]
+
+
+async def process_batch(batch_size: int) -> int:
+    async with SessionLocal() as session:
+        messages = await OutboxService.claim(session, batch_size)
+        if not messages:
+            return 0
+
+        groups: Dict[Tuple[EmailKind, str], List[EmailOutbox]] = defaultdict(list)
+        for message in messages:
+            groups[(message.kind, json.dumps(message.payload, sort_keys=True))].append(message)
+        # Параллельность ограничивает пул SMTP-соединений
+        results = await asyncio.gather(*(deliver(group) for group in groups.values()))
+
+        sent_ids: List[int] = []
+        failed_ids: Dict[str, List[int]] = defaultdict(list)
+        for group, errors in zip(groups.values(), results):
+            for message, error in zip(group, errors):
+                if error is None:
+                    sent_ids.append(message.id)
+                else:
+                    failed_ids[error].append(message.id)
+
+        await OutboxService.mark_sent(session, sent_ids)
+        for error, ids in failed_ids.items():
+            await OutboxService.mark_failed(session, ids, error)
+
+        failed = len(messages) - len(sent_ids)
+        logger.info(f"Outbox batch: {len(sent_ids)} sent, {failed} failed in {len(groups)} groups")
+        return len(messages)
+
+
+async def purge_outbox() -> None:
+    async with SessionLocal() as session:
+        deleted = await OutboxService.purge(
+            session, settings.EMAIL_OUTBOX_RETENTION_DAYS, settings.EMAIL_OUTBOX_BATCH_SIZE
+        )
+    if deleted:
+        logger.info(f"Outbox purge: {deleted} sent/dead emails older than {settings.EMAIL_OUTBOX_RETENTION_DAYS} days deleted")
+
+
+async def run(batch_size: int, poll_seconds: float) -> None:
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await init_db()
+    templates_cache.load()
+    logger.info("Email outbox worker started")
+    purged_at = None
+    try:
+        while not stopping.is_set():
+            if purged_at is None or time.monotonic() - purged_at >= settings.EMAIL_OUTBOX_PURGE_INTERVAL_SECONDS:
+                purged_at = time.monotonic()
+                try:
+                    await purge_outbox()
+                except Exception as e:
+                    logger.error(f"Outbox purge failed: {e}", exc_info=True)
+            try:
+                processed = await process_batch(batch_size)
+            except Exception as e:
+                logger.error(f"Outbox batch failed: {e}", exc_info=True)
+                processed = 0
+            # Полная пачка - сразу за следующей, иначе ждём новых писем
+            if processed < batch_size:
+                try:
+                    await asyncio.wait_for(stopping.wait(), timeout=poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        await smtp_pool.close()
+        await engine.dispose()
+        logger.info("Email outbox worker stopped")
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(run(settings.EMAIL_OUTBOX_BATCH_SIZE, settings.EMAIL_OUTBOX_POLL_SECONDS))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Enum, Index, String
+from sqlalchemy import Column, Enum, Index, String, text
 from sqlalchemy.orm import relationship
 
 from main.models.base import BaseModel
@@ -8,16 +8,16 @@ from users.enums.user import UserRole, UserStatus
 class User(BaseModel):
     __tablename__ = "users"
     __table_args__ = (
-        Index("idx_user_name_surname", "name", "surname"),
-        Index("idx_user_full_name", "name", "surname", "father_name"),
+        # По роли ищутся только админы (OutboxService.enqueue_for_admins)
+        Index("idx_user_admin", "id", postgresql_where=text("role = 'ADMIN'")),
     )
 
-    name = Column(String(128), index=True)
-    surname = Column(String(128), index=True)
-    father_name = Column(String(128), index=True, nullable=True)
+    name = Column(String(128))
+    surname = Column(String(128))
+    father_name = Column(String(128), nullable=True)
     email = Column(String(128), index=True, unique=True)
-    role = Column(Enum(UserRole), index=True, default=UserRole.USER)
-    status = Column(Enum(UserStatus), index=True, default=UserStatus.ACTIVE)
+    role = Column(Enum(UserRole), default=UserRole.USER)
+    status = Column(Enum(UserStatus), default=UserStatus.ACTIVE)
 
     hashed_password = Column(String, nullable=False)
 
@@ -1,11 +1,11 @@
-from asyncio import create_task
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Header, HTTPException, status
 
 from main.db.db import SessionDependency
 from main.schemas.responses import MessageResponse
-from notifications.services.email import EmailService
+from notifications.enums.outbox import EmailKind
+from notifications.services.outbox import OutboxService
 from users.enums.user import UserStatus
 from users.schemas.requests import (
     AuthRequest,
@@ -44,10 +44,11 @@ async def register_request(request: RegisterRequest, session: SessionDependency)
 
     verification_code = AuthService.generate_verification_code()
 
-    create_task(EmailService.send_verification_email(
-        email=request.email,
+    OutboxService.enqueue(
+        session, request.email, EmailKind.VERIFICATION,
         verification_code=verification_code
-    ))
+    )
+    await session.commit()
 
     # TODO: Make secure dictionary
     user_verification_codes[request.email] = {
@@ -105,15 +106,13 @@ async def register_confirm_request(request: RegisterConfirmRequest, session: Ses
         repeat_password=user_dict['repeat_password'],
     )
 
+    # Письмо фиксируется вместе с пользователем: create_user коммитит сессию
+    OutboxService.enqueue(session, user_dict['email'], EmailKind.WELCOME)
     await UsersService.create_user(
         session=session,
         new_user=user
     )
 
-    create_task(EmailService.send_welcome_email(
-        email=user_dict['email']
-    ))
-
     user_verification_codes.pop(request.email)
 
     return MessageResponse(message="User created successfuly")
@@ -209,10 +208,11 @@ async def reset_password_request(email: ResetPasswordRequest, session: SessionDe
             detail="User not found"
         )
 
-    create_task(EmailService.send_password_reset_email(
-        email=email.email,
-        reset_token=reset_token,
-    ))
+    OutboxService.enqueue(
+        session, email.email, EmailKind.PASSWORD_RESET,
+        reset_token=reset_token
+    )
+    await session.commit()
 
     return MessageResponse(message="Password reset email sent")
 
@@ -249,16 +249,14 @@ async def reset_password_apply_request(data: ResetPasswordApplyRequest, session:
             detail="User not found"
         )
 
+    # Письмо фиксируется вместе с новым паролем: reset_password коммитит сессию
+    OutboxService.enqueue(session, email, EmailKind.PASSWORD_RESET_SUCCESS)
     await UsersService.reset_password(
         session=session,
         email=email,
         new_password=data.password
     )
 
-    create_task(EmailService.send_password_reset_success_email(
-        email=email
-    ))
-
     return MessageResponse(message="Password reset successfuly")
 
 
@@ -280,10 +278,11 @@ async def resend_verification_email_request(request: ResendEmailRequest, session
 
         user_verification_codes[request.email] = user_dict
 
-        create_task(EmailService.send_verification_email(
-            email=request.email,
+        OutboxService.enqueue(
+            session, request.email, EmailKind.VERIFICATION,
             verification_code=verification_code
-        ))
+        )
+        await session.commit()
 
         return MessageResponse(message="Verification email sent")
     elif request.type == 'reset':
@@ -296,8 +295,9 @@ async def resend_verification_email_request(request: ResendEmailRequest, session
                 detail="User not found"
             )
         reset_token = AuthService.generate_reset_token(request.email)
-        create_task(EmailService.send_password_reset_email(
-            email=request.email,
+        OutboxService.enqueue(
+            session, request.email, EmailKind.PASSWORD_RESET,
             reset_token=reset_token
-        ))
+        )
+        await session.commit()
         return MessageResponse(message="Password reset email sent")
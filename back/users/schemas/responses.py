@@ -16,6 +16,14 @@ class UserResponse(BaseModel):
     role: UserRole
 
 
+class UserPreviewResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    surname: str
+
+
 class TokenResponse(BaseModel):
     access_token: str
     refresh_token: str
@@ -1,11 +1,12 @@
-from typing import List
+from typing import AsyncIterator, List
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from admin.schemas.requests import UserUpdateRequest
-from users.enums.user import UserRole
+from events.models.events import Event, EventMembers
+from events.services.cache import events_cache
 from users.models.user import User
 from users.schemas.requests import RegisterRequest
 from users.services.auth import AuthService
@@ -20,6 +21,14 @@ class UsersService:
         )
         return result.scalars().all()
 
+    @staticmethod
+    async def stream_users(session: AsyncSession, batch_size: int) -> AsyncIterator[List[User]]:
+        result = await session.stream(
+            select(User).order_by(User.id).execution_options(yield_per=batch_size)
+        )
+        async for users in result.scalars().partitions():
+            yield users
+
     @staticmethod
     async def get_user_by_email(session: AsyncSession, email: str) -> User:
         result = await session.execute(
@@ -72,7 +81,17 @@ class UsersService:
         user.role = new_data.role if new_data.role else user.role
         user.status = new_data.status if new_data.status else user.status
         session.add(user)
+        # Данные участника входят в EventResponse.members, поэтому меняем версии его событий (ETag)
+        result = await session.execute(
+            update(Event)
+            .where(Event.id.in_(select(EventMembers.event_id).where(EventMembers.user_id == user_id)))
+            .values(version=Event.version + 1)
+            .returning(Event.id)
+            .execution_options(synchronize_session=False)
+        )
+        event_ids = result.scalars().all()
         await session.commit()
+        events_cache.invalidate_events(event_ids)
         await session.refresh(user)
         return user
 
@@ -103,10 +122,3 @@ class UsersService:
         session.add(user)
         await session.commit()
         return True
-
-    @staticmethod
-    async def get_admin_emails(session: AsyncSession) -> List[str]:
-        result = await session.execute(
-            select(User.email).where(User.role == UserRole.ADMIN)
-        )
-        return result.scalars().all()
@@ -52,6 +52,7 @@ function getNotificationTitle(type) {
     "event_reminder": "Напоминание о событии",
     "review_request": "Оставьте отзыв на событие",
     "invitation": "Вас пригласили на событие",
+    "event_waitlist_promoted": "Освободилось место",
   };
   return titles[type] || "Уведомление";
 }
@@ -65,6 +66,7 @@ function getNotificationMessage(type, eventName) {
     "event_reminder": "Событие начнется скоро",
     "review_request": "Поделитесь впечатлениями",
     "invitation": "Подтвердите ваше участие",
+    "event_waitlist_promoted": "Вы переведены из очереди в участники события",
   };
   return messages[type] || "";
 }
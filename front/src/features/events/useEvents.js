@@ -164,8 +164,9 @@ export function useConfirmParticipation() {
 
   return useMutation({
     mutationFn: (eventId) => eventsApi.confirmParticipation(eventId),
-    onSuccess: (_, eventId) => {
-      updateEventParticipation(eventId, true);
+    onSuccess: (data, eventId) => {
+      // На заполненное событие сервер ставит в очередь ожидания, а не в участники
+      updateEventParticipation(eventId, data?.is_user_in_event ?? true);
       queryClient.invalidateQueries({ queryKey: EVENTS_QUERY_KEYS.all });
     },
   });